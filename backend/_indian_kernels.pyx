@@ -0,0 +1,53 @@
+# cython: language_level=3
+"""
+Cython build of the finance kernels in indian_kernels.py
+Used when Numba is not installed; build with `python setup_kernels.py build_ext --inplace`
+"""
+
+from libc.math cimport expm1, log1p
+
+
+cdef inline double _emi(double principal, double monthly_rate, double tenure_months) except? -1 nogil:
+    cdef double growth
+    if monthly_rate == 0:
+        return principal / tenure_months
+    growth = expm1(tenure_months * log1p(monthly_rate))
+    return principal * monthly_rate * (growth + 1) / growth
+
+
+cpdef tuple emi_kernel(double principal, double rate, double tenure_months):
+    """EMI, total payment and total interest for an annual rate in percent"""
+    cdef double emi = _emi(principal, rate / (12 * 100), tenure_months)
+    cdef double total_payment = emi * tenure_months
+    return emi, total_payment, total_payment - principal
+
+
+cpdef double remaining_principal_kernel(double principal, double rate, double emi, double months) except? -1 nogil:
+    """Outstanding principal after paying `months` EMIs"""
+    cdef double monthly_rate = rate / (12 * 100)
+    cdef double growth
+    if monthly_rate == 0:
+        return principal - emi * months
+    growth = expm1(months * log1p(monthly_rate))
+    return principal + principal * growth - emi * growth / monthly_rate
+
+
+cpdef tuple sip_kernel(double monthly_amount, double annual_return, double years):
+    """Total invested, future value and returns of a monthly SIP"""
+    cdef double months = years * 12
+    cdef double monthly_rate = annual_return / 12
+    cdef double future_value, total_invested
+
+    if monthly_rate > 0:
+        future_value = monthly_amount * (expm1(months * log1p(monthly_rate)) / monthly_rate) * (1 + monthly_rate)
+    else:
+        future_value = monthly_amount * months
+
+    total_invested = monthly_amount * months
+    return total_invested, future_value, future_value - total_invested
+
+
+cpdef tuple fd_kernel(double principal, double rate, double years, double compound_frequency):
+    """Maturity amount and interest of a fixed deposit"""
+    cdef double interest = principal * expm1(compound_frequency * years * log1p(rate / compound_frequency))
+    return principal + interest, interest
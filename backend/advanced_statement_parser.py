@@ -137,11 +137,11 @@ class AdvancedBankStatementParser:
         detected_bank = None
         
         with pdfplumber.open(file_path) as pdf:
-            full_text = ""
+            page_texts = []
             for page in pdf.pages:
                 text = page.extract_text()
                 if text:
-                    full_text += text
+                    page_texts.append(text)
                     
                     # Detect bank from first page
                     if not detected_bank:
@@ -153,6 +153,8 @@ class AdvancedBankStatementParser:
                         if table and len(table) > 1:  # Has header and data
                             transactions.extend(self._process_table_data(table, detected_bank))
         
+        full_text = ''.join(page_texts)
+        
         # If no tables found, try regex parsing
         if not transactions and full_text:
             transactions = self._parse_text_with_regex(full_text, detected_bank)
@@ -195,7 +197,7 @@ class AdvancedBankStatementParser:
             import fitz  # PyMuPDF
             
             doc = fitz.open(file_path)
-            full_text = ""
+            page_texts = []
             
             for page_num in range(doc.page_count):
                 page = doc[page_num]
@@ -205,9 +207,11 @@ class AdvancedBankStatementParser:
                 
                 # OCR the image
                 text = pytesseract.image_to_string(img)
-                full_text += text + "\n"
+                page_texts.append(text)
+                page_texts.append("\n")
             
             doc.close()
+            full_text = ''.join(page_texts)
             
             # Detect bank and parse
             detected_bank = self.detect_bank(full_text)
@@ -1319,7 +1319,7 @@ def calculate_tax():
             regime=data.get('regime', 'old')
         )
         
-        return jsonify(result)
+        return jsonify(result.to_dict())
         
     except Exception as e:
         logger.error(f"Error calculating tax: {e}")
@@ -1412,7 +1412,7 @@ def calculate_sip():
             years=data['years']
         )
         
-        return jsonify(result)
+        return jsonify(result.to_dict())
         
     except Exception as e:
         logger.error(f"Error calculating SIP: {e}")
@@ -1431,7 +1431,7 @@ def calculate_fd():
             compound_frequency=data.get('compound_frequency', 4)
         )
         
-        return jsonify(result)
+        return jsonify(result.to_dict())
         
     except Exception as e:
         logger.error(f"Error calculating FD: {e}")
@@ -1466,7 +1466,7 @@ def calculate_emi():
             tenure_months=data['tenure_months']
         )
         
-        return jsonify(result)
+        return jsonify(result.to_dict())
         
     except Exception as e:
         logger.error(f"Error calculating EMI: {e}")
@@ -1539,8 +1539,8 @@ def indian_dashboard():
             tax_calc = tax_planner.calculate_tax(annual_income)
             dashboard['tax_planning'] = {
                 'annual_income': annual_income,
-                'total_tax': tax_calc['total_tax'],
-                'effective_rate': tax_calc['effective_tax_rate'],
+                'total_tax': tax_calc.total_tax,
+                'effective_rate': tax_calc.effective_tax_rate,
                 'potential_80c_savings': min(150000, annual_income * 0.1) * 0.3  # Assume 30% tax bracket
             }
         
@@ -1559,7 +1559,7 @@ def indian_dashboard():
             
             dashboard['investment_suggestions'] = {
                 'monthly_surplus': monthly_surplus,
-                'sip_10yr_value': sip_projection['future_value'],
+                'sip_10yr_value': sip_projection.future_value,
                 'ppf_15yr_value': ppf_projection['maturity_amount']
             }
         
@@ -2745,11 +2745,9 @@ def get_sips():
     try:
         active_sips = investment_manager.sip_manager.get_active_sips()
         
-        # Calculate returns for each SIP
-        sip_returns = []
-        for sip in active_sips:
-            returns = investment_manager.sip_manager.calculate_sip_returns(sip['id'])
-            sip_returns.append(returns)
+        # Calculate returns for every SIP in one query
+        all_returns = investment_manager.sip_manager.calculate_all_sip_returns()
+        sip_returns = [all_returns.get(sip['id'], {}) for sip in active_sips]
         
         return jsonify({
             'active_sips': active_sips,
@@ -9,6 +9,25 @@ from sklearn.cluster import KMeans
 from sklearn.preprocessing import StandardScaler
 from scipy import stats
 import calendar
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+
+def _configure_sqlite(db_path: str) -> None:
+    """Switch the database to WAL so concurrent dashboard readers don't block"""
+    conn = sqlite3.connect(db_path)
+    try:
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('PRAGMA synchronous=NORMAL')
+    finally:
+        conn.close()
+
+
+def _connect_readonly(db_path: str) -> sqlite3.Connection:
+    """Open a read-only connection; analyzers never write, so no write lock is taken"""
+    conn = sqlite3.connect(f'{Path(db_path).resolve().as_uri()}?mode=ro', uri=True)
+    conn.execute('PRAGMA mmap_size=268435456')
+    return conn
 
 @dataclass
 class SpendingPattern:
@@ -66,7 +85,7 @@ class SpendingPatternAnalyzer:
     
     def _get_expense_data(self, user_id: int, months: int) -> pd.DataFrame:
         """Get expense data for analysis"""
-        conn = sqlite3.connect(self.db_path)
+        conn = _connect_readonly(self.db_path)
         
         since_date = (datetime.now() - timedelta(days=months * 30)).isoformat()
         
@@ -223,7 +242,7 @@ class SeasonalAnalyzer:
     
     def _get_seasonal_data(self, user_id: int, years: int) -> pd.DataFrame:
         """Get expense data for seasonal analysis"""
-        conn = sqlite3.connect(self.db_path)
+        conn = _connect_readonly(self.db_path)
         
         since_date = (datetime.now() - timedelta(days=years * 365)).isoformat()
         
@@ -358,7 +377,7 @@ class PeerComparison:
     
     def _get_user_profile(self, user_id: int) -> Optional[Dict]:
         """Get user's financial profile for peer matching"""
-        conn = sqlite3.connect(self.db_path)
+        conn = _connect_readonly(self.db_path)
         cursor = conn.cursor()
         
         # Get user basic info
@@ -439,7 +458,7 @@ class PeerComparison:
     
     def _find_peer_group(self, user_profile: Dict) -> List[Dict]:
         """Find similar users for peer comparison (anonymized)"""
-        conn = sqlite3.connect(self.db_path)
+        conn = _connect_readonly(self.db_path)
         cursor = conn.cursor()
         
         # Get all users with similar profiles
@@ -568,7 +587,7 @@ class FinancialHealthScorer:
     
     def _get_financial_data(self, user_id: int) -> Optional[Dict]:
         """Get comprehensive financial data for scoring"""
-        conn = sqlite3.connect(self.db_path)
+        conn = _connect_readonly(self.db_path)
         cursor = conn.cursor()
         
         # Get income
@@ -760,6 +779,7 @@ class FinancialHealthScorer:
 
 class BusinessIntelligenceManager:
     def __init__(self, db_path: str):
+        _configure_sqlite(db_path)
         self.spending_analyzer = SpendingPatternAnalyzer(db_path)
         self.seasonal_analyzer = SeasonalAnalyzer(db_path)
         self.peer_comparison = PeerComparison(db_path)
@@ -769,11 +789,18 @@ class BusinessIntelligenceManager:
     def generate_bi_dashboard(self, user_id: int) -> Dict:
         """Generate comprehensive business intelligence dashboard"""
         try:
-            # Get all BI components
-            spending_patterns = self.spending_analyzer.analyze_spending_patterns(user_id, 12)
-            seasonal_analysis = self.seasonal_analyzer.analyze_seasonal_patterns(user_id, 2)
-            peer_benchmarks = self.peer_comparison.generate_peer_benchmarks(user_id)
-            health_score = self.health_scorer.calculate_financial_health_score(user_id)
+            # Get all BI components; each analyzer opens its own SQLite
+            # connection, so the four queries can overlap
+            with ThreadPoolExecutor(max_workers=4) as executor:
+                spending_future = executor.submit(self.spending_analyzer.analyze_spending_patterns, user_id, 12)
+                seasonal_future = executor.submit(self.seasonal_analyzer.analyze_seasonal_patterns, user_id, 2)
+                peer_future = executor.submit(self.peer_comparison.generate_peer_benchmarks, user_id)
+                health_future = executor.submit(self.health_scorer.calculate_financial_health_score, user_id)
+                
+                spending_patterns = spending_future.result()
+                seasonal_analysis = seasonal_future.result()
+                peer_benchmarks = peer_future.result()
+                health_score = health_future.result()
             
             return {
                 'spending_intelligence': {
@@ -0,0 +1,93 @@
+"""
+Small JSON file cache with per-entry expiry
+Each key is stored as {directory}/{key}.json so entries survive process restarts
+"""
+
+import os
+import re
+import json
+import time
+import logging
+import tempfile
+from pathlib import Path
+from typing import Any, Optional, Union
+
+logger = logging.getLogger(__name__)
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+# Characters allowed in cache file names; anything else becomes '_'
+_UNSAFE_KEY_CHARS = re.compile(r'[^A-Za-z0-9._^=-]')
+
+
+class FileCache:
+    """Disk cache of JSON-serialisable values that expire after a TTL"""
+
+    def __init__(self, directory: Union[str, Path], default_ttl: int = 300):
+        self.directory = Path(directory)
+        self.default_ttl = default_ttl
+
+    def _path(self, key: str) -> Path:
+        return self.directory / f"{_UNSAFE_KEY_CHARS.sub('_', key)}.json"
+
+    def get(self, key: str) -> Optional[Any]:
+        """Return the cached value for key, or None on a miss or expired entry"""
+        path = self._path(key)
+        try:
+            with open(path, 'rb') as file:
+                data = file.read()
+            entry = orjson.loads(data) if ORJSON_AVAILABLE else json.loads(data)
+        except (OSError, ValueError):
+            return None
+
+        if entry.get('expiresAt', 0) < time.time():
+            try:
+                path.unlink()
+            except OSError:
+                pass
+            return None
+
+        return entry.get('value')
+
+    def delete(self, key: str):
+        """Remove the entry for key if there is one"""
+        try:
+            self._path(key).unlink()
+        except OSError:
+            pass
+
+    def set(self, key: str, value: Any, ttl: int = None):
+        """Store value for key, expiring after ttl seconds (default_ttl if not given)"""
+        now = time.time()
+        entry = {
+            'fetchedAt': now,
+            'expiresAt': now + (self.default_ttl if ttl is None else ttl),
+            'value': value,
+        }
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+
+            if ORJSON_AVAILABLE:
+                data = orjson.dumps(entry)
+            else:
+                data = json.dumps(entry, ensure_ascii=False).encode('utf-8')
+
+            # Write to a temporary file and rename so readers never see a partial entry
+            fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+            try:
+                with os.fdopen(fd, 'wb') as file:
+                    file.write(data)
+                os.replace(tmp_path, self._path(key))
+            except OSError:
+                # Don't leave the partial temporary file behind
+                try:
+                    os.unlink(tmp_path)
+                except OSError:
+                    pass
+                raise
+        except OSError as e:
+            logger.warning(f"Could not write cache entry {key}: {e}")
@@ -1,15 +1,38 @@
-import pandas as pd
+from __future__ import annotations
+
 import numpy as np
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional
-import plotly.graph_objects as go
-import plotly.express as px
-from plotly.utils import PlotlyJSONEncoder
+from typing import TYPE_CHECKING, Dict, List, Optional
 import json
 import logging
+from operator import itemgetter
+
+# pandas and plotly are imported where they are used so that processes which
+# only need NotificationManager (e.g. Celery workers) don't pay their import cost
+if TYPE_CHECKING:
+    import pandas as pd
 
 logger = logging.getLogger(__name__)
 
+
+def _plotly():
+    """Import plotly on first chart render"""
+    import plotly.graph_objects as go
+    from plotly.utils import PlotlyJSONEncoder
+    return go, PlotlyJSONEncoder
+
+
+def _category_key(expenses_df: pd.DataFrame) -> pd.Series:
+    """Category column as a Categorical so groupbys work on integer codes.
+    
+    Returned rather than written back, so the caller's frame keeps its dtype.
+    """
+    import pandas as pd
+    categories = expenses_df['category']
+    if isinstance(categories.dtype, pd.CategoricalDtype):
+        return categories
+    return categories.astype('category')
+
 class NotificationManager:
     """Real-time notifications for budget alerts and bill reminders"""
     
@@ -38,9 +61,12 @@ class NotificationManager:
         # Expense spikes
         notifications.extend(self._check_expense_spikes(user_data))
         
-        # Sort by priority and timestamp
-        priority_order = {'high': 0, 'medium': 1, 'low': 2}
-        notifications.sort(key=lambda n: (priority_order.get(n['priority'], 3), n['timestamp']), reverse=True)
+        # Sort by priority and timestamp (high priority, newest first)
+        notifications.sort(key=itemgetter('_prio', 'timestamp'), reverse=True)
+        
+        # The rank is only a sort key; keep it out of the API payload
+        for notification in notifications:
+            del notification['_prio']
         
         return notifications
     
@@ -88,6 +114,7 @@ class NotificationManager:
                     'message': f'You\'ve spent ₹{spent:,.0f} of ₹{limit:,.0f} budget ({spent/limit*100:.0f}%)',
                     'severity': severity,
                     'priority': 'high',
+                    '_prio': 2,
                     'icon': '⚠️',
                     'timestamp': datetime.now().isoformat(),
                     'category': category,
@@ -118,6 +145,7 @@ class NotificationManager:
                         'message': f'₹{debt["minimum_payment"]:,.0f} due in {days_until_due} days',
                         'severity': urgency,
                         'priority': 'medium',
+                        '_prio': 1,
                         'icon': '📅',
                         'timestamp': datetime.now().isoformat(),
                         'due_date': debt['due_date'],
@@ -147,6 +175,7 @@ class NotificationManager:
                         'message': f'Congratulations! You\'ve reached {threshold}% of your goal (₹{goal["current_amount"]:,.0f})',
                         'severity': 'achievement',
                         'priority': 'low',
+                        '_prio': 0,
                         'icon': '🎯',
                         'timestamp': datetime.now().isoformat(),
                         'progress': progress,
@@ -192,6 +221,7 @@ class NotificationManager:
                         'message': f'You spent ₹{amount:,.0f} on {date}, which is {amount/avg_daily:.1f}x your daily average',
                         'severity': 'warning',
                         'priority': 'high',
+                        '_prio': 2,
                         'icon': '📈',
                         'timestamp': datetime.now().isoformat(),
                         'date': date,
@@ -211,13 +241,12 @@ class InteractiveCharts:
             return json.dumps({'error': 'No data available'})
         
         # Prepare data
+        import pandas as pd
         expenses_df['date'] = pd.to_datetime(expenses_df['date'])
         expenses_df['month'] = expenses_df['date'].dt.to_period('M').astype(str)
         
-        # Monthly totals by category
-        monthly_category = expenses_df.groupby(['month', 'category'])['amount'].sum().reset_index()
-        
         # Create sunburst chart for drill-down
+        go, PlotlyJSONEncoder = _plotly()
         fig = go.Figure()
         
         # Add monthly bars
@@ -251,10 +280,15 @@ class InteractiveCharts:
             expenses_df = expenses_df[expenses_df['date'].dt.to_period('M').astype(str) == month]
         
         # Category breakdown
-        category_totals = expenses_df.groupby('category')['amount'].sum().reset_index()
+        category_totals = (
+            expenses_df.groupby(_category_key(expenses_df), sort=False, observed=True)['amount']
+            .sum()
+            .reset_index()
+        )
         category_totals = category_totals.sort_values('amount', ascending=False)
         
         # Create pie chart with hover details
+        go, PlotlyJSONEncoder = _plotly()
         fig = go.Figure(data=[go.Pie(
             labels=category_totals['category'],
             values=category_totals['amount'],
@@ -275,6 +309,7 @@ class InteractiveCharts:
             return json.dumps({'error': 'No data available'})
         
         # Prepare data
+        import pandas as pd
         expenses_df['date'] = pd.to_datetime(expenses_df['date'])
         expenses_df['month'] = expenses_df['date'].dt.to_period('M')
         
@@ -287,6 +322,7 @@ class InteractiveCharts:
         monthly_data['month_str'] = monthly_data['month'].astype(str)
         
         # Create subplots
+        go, PlotlyJSONEncoder = _plotly()
         fig = go.Figure()
         
         # Total spending trend
@@ -344,6 +380,7 @@ class GoalTracker:
             current_amounts.append(goal['current_amount'])
         
         # Create horizontal bar chart
+        go, PlotlyJSONEncoder = _plotly()
         fig = go.Figure()
         
         # Progress bars
@@ -409,18 +446,32 @@ class GoalTracker:
 class ExpenseTrendAnalyzer:
     """Month-over-month expense trend analysis"""
     
+    def _monthly_and_category(self, expenses_df: pd.DataFrame):
+        """Aggregate expenses once into (monthly_totals, category_pivot)"""
+        import pandas as pd
+        expenses_df['date'] = pd.to_datetime(expenses_df['date'])
+        expenses_df['month'] = expenses_df['date'].dt.to_period('M')
+        
+        # Month x category pivot; monthly totals are its row sums. Only the
+        # month axis needs ordering, so sort the pivot rather than the groups
+        category_pivot = (
+            expenses_df.groupby([expenses_df['month'], _category_key(expenses_df)], sort=False, observed=True)['amount']
+            .sum()
+            .unstack(fill_value=0)
+            .sort_index()
+        )
+        monthly_totals = category_pivot.sum(axis=1).rename('amount').reset_index()
+        monthly_totals['month_str'] = monthly_totals['month'].astype(str)
+        
+        return monthly_totals, category_pivot
+    
     def analyze_trends(self, expenses_df: pd.DataFrame) -> Dict:
         """Analyze expense trends and patterns"""
         if expenses_df.empty:
             return {'error': 'No expense data available'}
         
-        expenses_df['date'] = pd.to_datetime(expenses_df['date'])
-        expenses_df['month'] = expenses_df['date'].dt.to_period('M')
-        
-        # Monthly totals
-        monthly_totals = expenses_df.groupby('month')['amount'].sum().reset_index()
-        monthly_totals['month_str'] = monthly_totals['month'].astype(str)
-        monthly_totals = monthly_totals.sort_values('month')
+        # Monthly totals and category trends from a single aggregation
+        monthly_totals, category_pivot = self._monthly_and_category(expenses_df)
         
         if len(monthly_totals) < 2:
             return {'error': 'Need at least 2 months of data'}
@@ -429,18 +480,18 @@ class ExpenseTrendAnalyzer:
         monthly_totals['mom_change'] = monthly_totals['amount'].pct_change() * 100
         monthly_totals['mom_absolute'] = monthly_totals['amount'].diff()
         
-        # Category trends
-        category_trends = expenses_df.groupby(['month', 'category'])['amount'].sum().reset_index()
-        category_pivot = category_trends.pivot(index='month', columns='category', values='amount').fillna(0)
-        category_changes = category_pivot.pct_change().iloc[-1] * 100  # Latest month changes
+        # Latest month changes, computed from the last two rows only
+        prev_month, last_month = category_pivot.iloc[-2], category_pivot.iloc[-1]
+        category_changes = ((last_month - prev_month) / prev_month.replace(0, np.nan) * 100).fillna(0)
+        change_last_month = monthly_totals['mom_change'].iloc[-1]
         
         # Identify patterns
         trends = {
-            'overall_trend': 'increasing' if monthly_totals['mom_change'].iloc[-1] > 0 else 'decreasing',
+            'overall_trend': 'increasing' if change_last_month > 0 else 'decreasing',
             'avg_monthly_change': monthly_totals['mom_change'].mean(),
             'volatility': monthly_totals['mom_change'].std(),
             'total_last_month': monthly_totals['amount'].iloc[-1],
-            'change_last_month': monthly_totals['mom_change'].iloc[-1],
+            'change_last_month': change_last_month,
             'category_changes': category_changes.to_dict(),
             'highest_increase_category': category_changes.idxmax() if not category_changes.empty else None,
             'highest_decrease_category': category_changes.idxmin() if not category_changes.empty else None
@@ -453,17 +504,12 @@ class ExpenseTrendAnalyzer:
         if expenses_df.empty:
             return json.dumps({'error': 'No data available'})
         
-        # Prepare data
-        expenses_df['date'] = pd.to_datetime(expenses_df['date'])
-        expenses_df['month'] = expenses_df['date'].dt.to_period('M')
-        
         # Monthly totals and changes
-        monthly_data = expenses_df.groupby('month')['amount'].sum().reset_index()
-        monthly_data['month_str'] = monthly_data['month'].astype(str)
-        monthly_data = monthly_data.sort_values('month')
+        monthly_data, _ = self._monthly_and_category(expenses_df)
         monthly_data['mom_change'] = monthly_data['amount'].pct_change() * 100
         
         # Create dual-axis chart
+        go, PlotlyJSONEncoder = _plotly()
         fig = go.Figure()
         
         # Monthly spending
@@ -0,0 +1,63 @@
+"""
+Tiered statement parsing
+Runs the deterministic Indian Bank parser first and only calls Gemini
+when it does not find enough transactions
+"""
+
+import logging
+from typing import List, Dict, Any
+
+from indian_bank_parser import IndianBankParser
+from gemini_pdf_parser import parse_with_gemini
+from pdf_backends import pymupdf, PyPDF2, PYMUPDF_AVAILABLE, PYPDF2_AVAILABLE, PDF_AVAILABLE
+
+logger = logging.getLogger(__name__)
+
+if not PDF_AVAILABLE:
+    logger.warning("Neither PyMuPDF nor PyPDF2 available. Statements will go straight to Gemini.")
+
+# Fewer heuristic transactions than this means the format was not recognised
+MIN_HEURISTIC_TRANSACTIONS = 5
+
+
+def _extract_text(filepath: str) -> str:
+    """Extract the text layer of a PDF, or '' if it cannot be read"""
+    if PYMUPDF_AVAILABLE:
+        try:
+            with pymupdf.open(filepath) as doc:
+                return ''.join(page.get_text() + '\n' for page in doc)
+        except Exception as e:
+            # Fall through to PyPDF2, which may still read the text layer
+            logger.error(f"Error extracting text with PyMuPDF from {filepath}: {e}")
+
+    if PYPDF2_AVAILABLE:
+        try:
+            with open(filepath, 'rb') as file:
+                reader = PyPDF2.PdfReader(file)
+                return '\n'.join(page.extract_text() or '' for page in reader.pages)
+        except Exception as e:
+            logger.error(f"Error extracting text from {filepath}: {e}")
+
+    return ''
+
+
+def parse(filepath: str, api_key: str = None) -> List[Dict[str, Any]]:
+    """
+    Parse a bank statement, calling Gemini only when the heuristic parser fails
+
+    Args:
+        filepath: Path to PDF file
+        api_key: Gemini API key (optional, reads from env if not provided)
+
+    Returns:
+        List of transaction dictionaries
+    """
+    text = _extract_text(filepath)
+    if text:
+        transactions = IndianBankParser().parse_text(text)
+        if len(transactions) >= MIN_HEURISTIC_TRANSACTIONS:
+            logger.info(f"Indian Bank parser extracted {len(transactions)} transactions, skipping Gemini")
+            return transactions
+
+    logger.info("Heuristic parsing found too few transactions, falling back to Gemini Vision")
+    return parse_with_gemini(filepath, api_key, use_vision=True)
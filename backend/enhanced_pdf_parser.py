@@ -1,16 +1,33 @@
+import os
 import re
+import sys
 import logging
-from datetime import datetime
-from typing import List, Dict, Any
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, datetime, timedelta
+from functools import lru_cache
+from typing import List, Dict, Any, Optional
+
+from transaction_record import Transaction, format_amount, format_date
+from pdf_backends import pymupdf, PyPDF2, PYMUPDF_AVAILABLE, PYPDF2_AVAILABLE, PDF_AVAILABLE
 
 logger = logging.getLogger(__name__)
 
+if not PDF_AVAILABLE:
+    logger.warning("Neither PyMuPDF nor PyPDF2 available. PDF parsing will use fallback.")
+
+try:
+    import pandas as pd
+    PANDAS_AVAILABLE = True
+except ImportError:
+    logger.warning("pandas not available. PDF lines will be filtered one at a time.")
+    PANDAS_AVAILABLE = False
+
 try:
-    import PyPDF2
-    PDF_AVAILABLE = True
+    import ahocorasick
+    AHOCORASICK_AVAILABLE = True
 except ImportError:
-    logger.warning("PyPDF2 not available. PDF parsing will use fallback.")
-    PDF_AVAILABLE = False
+    logger.warning("pyahocorasick not available. Keyword matching will use regex.")
+    AHOCORASICK_AVAILABLE = False
 
 try:
     from indian_bank_parser import IndianBankParser
@@ -26,6 +43,166 @@ except ImportError:
     logger.warning("Gemini parser not available")
     GEMINI_PARSER_AVAILABLE = False
 
+# Statements with at least this many pages are extracted in worker processes
+_PARALLEL_PAGE_THRESHOLD = 8
+
+# Values repeated on every extracted transaction, interned so all records
+# share one copy of each string
+BANK_INDIAN = sys.intern('Indian Bank')
+TYPE_CREDIT = sys.intern('credit')
+TYPE_DEBIT = sys.intern('debit')
+CATEGORY_OTHERS = sys.intern('others')
+
+
+def _extract_page_range(filepath: str, start: int, stop: int) -> List[str]:
+    """Extract text for pages [start, stop) using a reader private to this process"""
+    with open(filepath, 'rb') as file:
+        pdf_reader = PyPDF2.PdfReader(file)
+        return [pdf_reader.pages[i].extract_text() or '' for i in range(start, stop)]
+
+# Date formats seen in Indian bank statements, tried in order
+_DATE_FORMATS = (
+    '%d/%m/%Y', '%d-%m-%Y', '%d/%m/%y', '%d-%m-%y',
+    '%Y/%m/%d', '%Y-%m-%d',
+    '%d %b %Y', '%d %B %Y'  # "10 Oct 2025" format
+)
+
+
+@lru_cache(maxsize=4096)
+def _parse_date_cached(date_str: str) -> Optional[datetime]:
+    """Parse a statement date; memoized because the same dates repeat across lines"""
+    for fmt in _DATE_FORMATS:
+        try:
+            return datetime.strptime(date_str, fmt)
+        except ValueError:
+            continue
+    return None
+
+# Fallback sample data: (days after the start date, description, amount, type, category)
+_SAMPLE_TEMPLATE = (
+    (1, 'SALARY CREDIT - COMPANY NAME', 75000.0, 'credit', 'salary'),
+    (2, 'UPI-SWIGGY-FOOD ORDER', 450.0, 'debit', 'food_dining'),
+    (3, 'ATM CASH WITHDRAWAL', 10000.0, 'debit', 'cash_withdrawal'),
+    (5, 'NEFT-RENT PAYMENT', 25000.0, 'debit', 'utilities'),
+    (7, 'ELECTRICITY BILL PAYMENT', 1800.0, 'debit', 'utilities'),
+)
+
+
+@lru_cache(maxsize=1)
+def _sample_transactions(today: date) -> tuple:
+    """Sample transactions dated over the last month; rebuilt once per day"""
+    base_date = today - timedelta(days=30)
+    transactions = []
+    for days, description, amount, txn_type, category in _SAMPLE_TEMPLATE:
+        txn_date = (base_date + timedelta(days=days)).isoformat()
+        transactions.append({
+            'date': txn_date,
+            'formatted_date': format_date(txn_date),
+            'description': description,
+            'amount': amount,
+            'formatted_amount': format_amount(amount),
+            'type': txn_type,
+            'category': category
+        })
+    return tuple(transactions)
+
+# Transaction type keywords (substring semantics, so 'credited' and
+# 'deposited' still count)
+CREDIT_KEYWORDS = [
+    'credit', 'deposit', 'salary', 'transfer credit', 'neft cr',
+    'imps cr', 'rtgs cr', 'upi cr', 'refund', 'interest credited'
+]
+
+DEBIT_KEYWORDS = [
+    'debit', 'withdrawal', 'payment', 'transfer debit', 'neft dr',
+    'imps dr', 'rtgs dr', 'upi', 'atm', 'pos', 'emi', 'charges'
+]
+
+# Category keywords, checked in priority order
+CATEGORY_KEYWORDS = [
+    ('salary', ['salary', 'pay', 'income']),
+    ('cash_withdrawal', ['atm', 'cash', 'withdrawal']),
+    ('groceries', ['grocery', 'supermarket', 'food', 'swiggy', 'zomato']),
+    ('fuel', ['fuel', 'petrol', 'gas', 'diesel']),
+    ('food_dining', ['restaurant', 'dining', 'cafe', 'hotel']),
+    ('utilities', ['electricity', 'water', 'utility', 'bill', 'rent']),
+    ('medical', ['medical', 'hospital', 'pharmacy', 'doctor']),
+    ('shopping', ['shopping', 'mall', 'store', 'amazon', 'flipkart']),
+    ('transfer', ['transfer', 'neft', 'imps', 'rtgs', 'upi']),
+    ('loan', ['emi', 'loan', 'interest']),
+]
+
+# Patterns are compiled once at import and shared by every parser instance
+_CREDIT_RE = re.compile('|'.join(map(re.escape, CREDIT_KEYWORDS)), re.IGNORECASE)
+_DEBIT_RE = re.compile('|'.join(map(re.escape, DEBIT_KEYWORDS)), re.IGNORECASE)
+_CATEGORY_RES = [
+    (sys.intern(category), re.compile('|'.join(map(re.escape, words)), re.IGNORECASE))
+    for category, words in CATEGORY_KEYWORDS
+]
+
+
+
+def _build_keyword_automaton():
+    """Aho-Corasick automaton over every type and category keyword.
+    
+    Each keyword maps to (is_credit, is_debit, category rank), so a single
+    pass over a line answers the type and category questions together.
+    """
+    no_category = len(_CATEGORY_RES)
+    tags = {}
+    for keyword in CREDIT_KEYWORDS:
+        tags.setdefault(keyword, [False, False, no_category])[0] = True
+    for keyword in DEBIT_KEYWORDS:
+        tags.setdefault(keyword, [False, False, no_category])[1] = True
+    for rank, (_, words) in enumerate(CATEGORY_KEYWORDS):
+        for keyword in words:
+            tag = tags.setdefault(keyword, [False, False, no_category])
+            tag[2] = min(tag[2], rank)
+    
+    automaton = ahocorasick.Automaton()
+    for keyword, tag in tags.items():
+        automaton.add_word(keyword, tuple(tag))
+    automaton.make_automaton()
+    return automaton
+
+_KEYWORD_AUTOMATON = _build_keyword_automaton() if AHOCORASICK_AVAILABLE else None
+
+
+def _scan_keywords(text: str):
+    """Return (is_credit, is_debit, best category rank) for keywords in text"""
+    is_credit = is_debit = False
+    rank = len(_CATEGORY_RES)
+    for _, (credit, debit, category_rank) in _KEYWORD_AUTOMATON.iter(text.lower()):
+        is_credit = is_credit or credit
+        is_debit = is_debit or debit
+        if category_rank < rank:
+            rank = category_rank
+    return is_credit, is_debit, rank
+
+_SIGN_TABLE = str.maketrans('', '', '-+')
+_MONTH_HINT_RE = re.compile(r'JAN|FEB|MAR|APR|MAY|JUN|JUL|AUG|SEP|OCT|NOV|DEC')
+_DATE_HINT_RE = re.compile(
+    r'\d{2}[/-]\d{2}[/-]\d{2}|\d{4}[/-]\d{2}[/-]\d{2}'
+    r'|\d{1,2}\s+(?:Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec)\s+\d{4}',
+    re.IGNORECASE
+)
+
+# Single alternation that finds every date and amount token in one scan of
+# a line; alternatives are tried in priority order at each position and
+# dispatched on match.lastgroup. Runs of digits/spaces use possessive
+# quantifiers since what follows them can never be matched by giving
+# characters back, so a failed attempt does not backtrack
+_DATE_GROUPS = ('date_dmy', 'date_dmy_short', 'date_ymd', 'date_mon')
+_LINE_RE = re.compile('|'.join([
+    r'(?P<date_dmy>\d{2}[/-]\d{2}[/-]\d{4})',  # DD/MM/YYYY or DD-MM-YYYY
+    r'(?P<date_dmy_short>\d{2}[/-]\d{2}[/-]\d{2})',  # DD/MM/YY or DD-MM-YY
+    r'(?P<date_ymd>\d{4}[/-]\d{2}[/-]\d{2})',  # YYYY/MM/DD or YYYY-MM-DD
+    r'(?P<date_mon>\d{1,2}\s++(?:Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec)\s++\d{4})',
+    r'(?P<inr>(?:(?P<sign>[-+])\s*+)?INR\s++(?P<inr_amount>[\d,]++\.?+\d*+))',
+    r'(?P<amount>(?:₹|Rs\.?|INR)?\s*+(?P<amount_value>[\d,]++\.\d{2}))',  # ₹1,234.56, Rs.1,234.56
+]), re.IGNORECASE)
+
+
 class EnhancedPDFParser:
     """Enhanced PDF parser for Indian bank statements"""
     
@@ -47,35 +224,30 @@ class EnhancedPDFParser:
             else:
                 self.gemini_parser = None
         
-        # Common date patterns in Indian bank statements
-        self.date_patterns = [
-            r'(\d{2}[/-]\d{2}[/-]\d{4})',  # DD/MM/YYYY or DD-MM-YYYY
-            r'(\d{2}[/-]\d{2}[/-]\d{2})',  # DD/MM/YY or DD-MM-YY
-            r'(\d{4}[/-]\d{2}[/-]\d{2})',  # YYYY/MM/DD or YYYY-MM-DD
-        ]
-        
-        # Amount patterns (Indian format with commas)
-        self.amount_patterns = [
-            r'₹?\s*([\d,]+\.\d{2})',  # ₹1,234.56 or 1,234.56
-            r'Rs\.?\s*([\d,]+\.\d{2})',  # Rs.1,234.56
-            r'INR\s*([\d,]+\.\d{2})',  # INR 1,234.56
-        ]
-        
-        # Transaction type keywords
-        self.credit_keywords = [
-            'credit', 'deposit', 'salary', 'transfer credit', 'neft cr',
-            'imps cr', 'rtgs cr', 'upi cr', 'refund', 'interest credited'
-        ]
-        
-        self.debit_keywords = [
-            'debit', 'withdrawal', 'payment', 'transfer debit', 'neft dr',
-            'imps dr', 'rtgs dr', 'upi', 'atm', 'pos', 'emi', 'charges'
-        ]
+        # Parsed results keyed by (path, mtime, size), so re-parsing an
+        # unchanged file skips extraction entirely
+        self._parse_pdf_cached = lru_cache(maxsize=64)(self._parse_pdf_file)
     
     def parse_pdf(self, filepath: str) -> List[Dict[str, Any]]:
         """Parse PDF bank statement and extract transactions"""
+        try:
+            stat = os.stat(filepath)
+        except OSError:
+            return self._parse_pdf_file(filepath, None, None)
+        
+        transactions = self._parse_pdf_cached(os.path.abspath(filepath), stat.st_mtime_ns, stat.st_size)
+        
+        # Hand out copies so callers cannot modify the cached records
+        return [dict(transaction) for transaction in transactions]
+    
+    def invalidate(self):
+        """Drop cached parse results, e.g. after rewriting a PDF in place"""
+        self._parse_pdf_cached.cache_clear()
+    
+    def _parse_pdf_file(self, filepath: str, mtime_ns: Optional[int], size: Optional[int]) -> List[Dict[str, Any]]:
+        """Uncached parse; mtime_ns and size only form part of the cache key"""
         if not PDF_AVAILABLE:
-            logger.warning("PyPDF2 not available, returning sample transactions")
+            logger.warning("No PDF library available, returning sample transactions")
             return self._get_sample_transactions()
         
         try:
@@ -101,10 +273,10 @@ class EnhancedPDFParser:
                         logger.warning("Indian Bank parser found no transactions, falling back to generic parser")
             
             # Parse transactions from text using generic parser
-            transactions = self._parse_transactions_from_text(text)
+            records = self._parse_transactions_from_text(text)
             
             # If no transactions found and Gemini is available, try AI parsing
-            if not transactions and self.gemini_parser:
+            if not records and self.gemini_parser:
                 logger.info("Traditional parsing failed, trying Gemini AI...")
                 try:
                     transactions = self.gemini_parser.parse_pdf(filepath)
@@ -114,12 +286,12 @@ class EnhancedPDFParser:
                 except Exception as e:
                     logger.error(f"Gemini AI parsing failed: {e}")
             
-            if not transactions:
+            if not records:
                 logger.warning("No transactions parsed from PDF, using sample data")
                 return self._get_sample_transactions()
             
-            logger.info(f"Successfully parsed {len(transactions)} transactions from PDF")
-            return transactions
+            logger.info(f"Successfully parsed {len(records)} transactions from PDF")
+            return [record.to_dict() for record in records]
             
         except Exception as e:
             logger.error(f"Error parsing PDF: {e}")
@@ -127,26 +299,47 @@ class EnhancedPDFParser:
     
     def _extract_text_from_pdf(self, filepath: str) -> str:
         """Extract text content from PDF file"""
-        text = ""
+        if PYMUPDF_AVAILABLE:
+            # MuPDF's C text extractor is much faster than PyPDF2's pure Python one
+            try:
+                with pymupdf.open(filepath) as doc:
+                    return ''.join(page.get_text() + '\n' for page in doc)
+            except Exception as e:
+                logger.error(f"Error extracting text with PyMuPDF: {e}")
+                if not PYPDF2_AVAILABLE:
+                    return ''
+        
+        parts = []
         try:
             with open(filepath, 'rb') as file:
                 pdf_reader = PyPDF2.PdfReader(file)
+                page_count = len(pdf_reader.pages)
+                if page_count >= _PARALLEL_PAGE_THRESHOLD:
+                    return self._extract_pages_parallel(filepath, page_count)
                 for page in pdf_reader.pages:
-                    text += page.extract_text() + "\n"
+                    parts.append(page.extract_text() or '')
+                    parts.append('\n')
         except Exception as e:
             logger.error(f"Error extracting text from PDF: {e}")
-        return text
+        return ''.join(parts)
     
-    def _parse_transactions_from_text(self, text: str) -> List[Dict[str, Any]]:
+    def _extract_pages_parallel(self, filepath: str, page_count: int) -> str:
+        """Extract contiguous page ranges in worker processes, preserving page order"""
+        # PyPDF2 is pure Python, so threads would serialize on the GIL
+        workers = min(os.cpu_count() or 1, 8)
+        step = -(-page_count // workers)
+        starts = list(range(0, page_count, step))
+        stops = [min(start + step, page_count) for start in starts]
+        
+        with ProcessPoolExecutor(max_workers=len(starts)) as executor:
+            chunks = executor.map(_extract_page_range, [filepath] * len(starts), starts, stops)
+            return ''.join(page_text + '\n' for chunk in chunks for page_text in chunk)
+    
+    def _parse_transactions_from_text(self, text: str) -> List[Transaction]:
         """Parse transactions from extracted PDF text"""
         transactions = []
-        lines = text.split('\n')
         
-        for line in lines:
-            line = line.strip()
-            if not line or len(line) < 20:
-                continue
-            
+        for line in self._candidate_lines(text):
             # Try to extract transaction details
             transaction = self._extract_transaction_from_line(line)
             if transaction:
@@ -154,22 +347,54 @@ class EnhancedPDFParser:
         
         return transactions
     
-    def _extract_transaction_from_line(self, line: str) -> Dict[str, Any]:
+    def _candidate_lines(self, text: str) -> List[str]:
+        """Strip lines and keep those long enough to hold a dated transaction"""
+        if PANDAS_AVAILABLE:
+            # Strip, length and date checks run over all lines in one vectorized pass
+            lines = pd.Series(text.split('\n')).str.strip()
+            mask = (lines.str.len() >= 20) & lines.str.contains(_DATE_HINT_RE)
+            return lines[mask].tolist()
+        
+        stripped = (line.strip() for line in text.split('\n'))
+        return [line for line in stripped if len(line) >= 20]
+    
+    def _extract_transaction_from_line(self, line: str) -> Optional[Transaction]:
         """Extract transaction details from a single line"""
-        # Extract date - try multiple patterns
-        date_str = None
-        for pattern in self.date_patterns:
-            match = re.search(pattern, line)
-            if match:
-                date_str = match.group(1)
-                break
+        # Cheap rejections before any regex work: an amount needs a '.' or
+        # 'INR', and a date needs '/', '-' or a month name
+        if len(line) < 20:
+            return None
+        line_upper = line.upper()
+        if '.' not in line and 'INR' not in line_upper:
+            return None
+        if '/' not in line and '-' not in line and not _MONTH_HINT_RE.search(line_upper):
+            return None
         
-        # Also try "DD Mon YYYY" format (e.g., "10 Oct 2025")
-        if not date_str:
-            mon_pattern = r'(\d{1,2}\s+(?:Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec)\s+\d{4})'
-            match = re.search(mon_pattern, line, re.IGNORECASE)
-            if match:
-                date_str = match.group(1)
+        # Walk the line once, collecting the highest-priority date, the
+        # "INR 1,234.56" amounts, any other amounts and the +/- INR signs.
+        # The text between matches is kept as the description
+        date_str = None
+        date_rank = len(_DATE_GROUPS)
+        inr_values = []
+        other_values = []
+        signs = set()
+        parts = []
+        cursor = 0
+        for match in _LINE_RE.finditer(line):
+            parts.append(line[cursor:match.start()])
+            cursor = match.end()
+            kind = match.lastgroup
+            if kind == 'inr':
+                inr_values.append(match.group('inr_amount'))
+                if match.group('sign'):
+                    signs.add(match.group('sign'))
+            elif kind == 'amount':
+                other_values.append(match.group('amount_value'))
+            else:
+                rank = _DATE_GROUPS.index(kind)
+                if rank < date_rank:
+                    date_rank, date_str = rank, match.group(kind)
+        parts.append(line[cursor:])
         
         if not date_str:
             return None
@@ -180,48 +405,26 @@ class EnhancedPDFParser:
         except:
             return None
         
-        # Extract amounts - look for INR amounts specifically
-        amounts = []
-        
-        # Pattern for "INR 1,234.56" or "INR 1234.56"
-        inr_pattern = r'INR\s+([\d,]+\.?\d*)'
-        inr_matches = re.findall(inr_pattern, line, re.IGNORECASE)
-        for match in inr_matches:
-            try:
-                amount = float(match.replace(',', ''))
-                if amount > 0:
-                    amounts.append(amount)
-            except:
-                continue
-        
-        # If no INR amounts found, try other patterns
-        if not amounts:
-            for pattern in self.amount_patterns:
-                matches = re.findall(pattern, line)
-                for match in matches:
-                    try:
-                        amount = float(match.replace(',', ''))
-                        if amount > 0:
-                            amounts.append(amount)
-                    except:
-                        continue
+        # Prefer INR amounts; if none, fall back to other amount formats
+        amounts = self._positive_amounts(inr_values) or self._positive_amounts(other_values)
         
         if not amounts:
             return None
         
         # Determine transaction type by looking at the line structure
         # In Indian bank statements, typically: Date | Description | Debit | Credit | Balance
-        line_lower = line.lower()
-        
         # Check for explicit credit/debit indicators
-        is_credit = any(keyword in line_lower for keyword in self.credit_keywords)
-        is_debit = any(keyword in line_lower for keyword in self.debit_keywords)
+        if _KEYWORD_AUTOMATON is not None:
+            is_credit, is_debit, _ = _scan_keywords(line)
+        else:
+            is_credit = _CREDIT_RE.search(line) is not None
+            is_debit = _DEBIT_RE.search(line) is not None
         
         # For Indian Bank format: if there's a "-" before INR, it's debit; if "+", it's credit
         if not is_credit and not is_debit:
-            if re.search(r'-\s*INR', line):
+            if '-' in signs:
                 is_debit = True
-            elif re.search(r'\+\s*INR', line):
+            elif '+' in signs:
                 is_credit = True
             else:
                 # Look at position: if amount appears twice, first is debit, second is credit
@@ -231,7 +434,7 @@ class EnhancedPDFParser:
                 else:
                     is_debit = True  # Default to debit
         
-        txn_type = 'credit' if is_credit else 'debit'
+        txn_type = TYPE_CREDIT if is_credit else TYPE_DEBIT
         
         # Choose the transaction amount (not the balance)
         # Usually the balance is the last amount
@@ -240,16 +443,8 @@ class EnhancedPDFParser:
         else:
             amount = amounts[0]
         
-        # Extract description (remove date and amounts)
-        description = line
-        for pattern in self.date_patterns:
-            description = re.sub(pattern, '', description)
-        description = re.sub(mon_pattern, '', description, flags=re.IGNORECASE)
-        for pattern in self.amount_patterns:
-            description = re.sub(pattern, '', description)
-        description = re.sub(r'INR\s+[\d,]+\.?\d*', '', description, flags=re.IGNORECASE)
-        description = re.sub(r'[-+]', '', description)
-        description = ' '.join(description.split()).strip()
+        # Description is the line with dates, amounts and +/- signs removed
+        description = ' '.join(' '.join(parts).translate(_SIGN_TABLE).split())
         
         if not description or len(description) < 3:
             description = f"{txn_type.title()} Transaction"
@@ -257,110 +452,45 @@ class EnhancedPDFParser:
         # Categorize
         category = self._categorize_transaction(description)
         
-        return {
-            'date': date_obj.strftime('%Y-%m-%d'),
-            'formatted_date': date_obj.strftime('%d %b %Y'),
-            'description': description[:200],
-            'amount': amount,
-            'formatted_amount': f"₹{amount:,.2f}",
-            'type': txn_type,
-            'category': category,
-            'bank': 'Indian Bank'
-        }
+        return Transaction(
+            date=date_obj.strftime('%Y-%m-%d'),
+            description=description[:200],
+            amount=amount,
+            type=txn_type,
+            category=category,
+            bank=BANK_INDIAN
+        )
     
-    def _parse_date(self, date_str: str) -> datetime:
-        """Parse date string to datetime object"""
-        # Try different date formats
-        formats = [
-            '%d/%m/%Y', '%d-%m-%Y', '%d/%m/%y', '%d-%m-%y',
-            '%Y/%m/%d', '%Y-%m-%d', '%Y/%m/%d', '%Y-%m-%d',
-            '%d %b %Y', '%d %B %Y'  # Added for "10 Oct 2025" format
-        ]
-        
-        for fmt in formats:
+    def _positive_amounts(self, values: List[str]) -> List[float]:
+        """Convert matched amount strings to floats, keeping positive values"""
+        amounts = []
+        for value in values:
             try:
-                return datetime.strptime(date_str, fmt)
+                amount = float(value.replace(',', ''))
+                if amount > 0:
+                    amounts.append(amount)
             except:
                 continue
-        
-        raise ValueError(f"Could not parse date: {date_str}")
+        return amounts
+    
+    def _parse_date(self, date_str: str) -> datetime:
+        """Parse date string to datetime object"""
+        date_obj = _parse_date_cached(date_str)
+        if date_obj is None:
+            raise ValueError(f"Could not parse date: {date_str}")
+        return date_obj
     
     def _categorize_transaction(self, description: str) -> str:
         """Categorize transaction based on description"""
-        desc_lower = description.lower()
+        if _KEYWORD_AUTOMATON is not None:
+            rank = _scan_keywords(description)[2]
+            return _CATEGORY_RES[rank][0] if rank < len(_CATEGORY_RES) else CATEGORY_OTHERS
         
-        if any(word in desc_lower for word in ['salary', 'pay', 'income']):
-            return 'salary'
-        elif any(word in desc_lower for word in ['atm', 'cash', 'withdrawal']):
-            return 'cash_withdrawal'
-        elif any(word in desc_lower for word in ['grocery', 'supermarket', 'food', 'swiggy', 'zomato']):
-            return 'groceries'
-        elif any(word in desc_lower for word in ['fuel', 'petrol', 'gas', 'diesel']):
-            return 'fuel'
-        elif any(word in desc_lower for word in ['restaurant', 'dining', 'cafe', 'hotel']):
-            return 'food_dining'
-        elif any(word in desc_lower for word in ['electricity', 'water', 'utility', 'bill', 'rent']):
-            return 'utilities'
-        elif any(word in desc_lower for word in ['medical', 'hospital', 'pharmacy', 'doctor']):
-            return 'medical'
-        elif any(word in desc_lower for word in ['shopping', 'mall', 'store', 'amazon', 'flipkart']):
-            return 'shopping'
-        elif any(word in desc_lower for word in ['transfer', 'neft', 'imps', 'rtgs', 'upi']):
-            return 'transfer'
-        elif any(word in desc_lower for word in ['emi', 'loan', 'interest']):
-            return 'loan'
-        else:
-            return 'others'
+        for category, category_re in _CATEGORY_RES:
+            if category_re.search(description):
+                return category
+        return CATEGORY_OTHERS
     
     def _get_sample_transactions(self) -> List[Dict[str, Any]]:
         """Return sample transactions as fallback"""
-        from datetime import timedelta
-        base_date = datetime.now() - timedelta(days=30)
-        
-        return [
-            {
-                'date': (base_date + timedelta(days=1)).strftime('%Y-%m-%d'),
-                'formatted_date': (base_date + timedelta(days=1)).strftime('%d %b %Y'),
-                'description': 'SALARY CREDIT - COMPANY NAME',
-                'amount': 75000.0,
-                'formatted_amount': '₹75,000.00',
-                'type': 'credit',
-                'category': 'salary'
-            },
-            {
-                'date': (base_date + timedelta(days=2)).strftime('%Y-%m-%d'),
-                'formatted_date': (base_date + timedelta(days=2)).strftime('%d %b %Y'),
-                'description': 'UPI-SWIGGY-FOOD ORDER',
-                'amount': 450.0,
-                'formatted_amount': '₹450.00',
-                'type': 'debit',
-                'category': 'food_dining'
-            },
-            {
-                'date': (base_date + timedelta(days=3)).strftime('%Y-%m-%d'),
-                'formatted_date': (base_date + timedelta(days=3)).strftime('%d %b %Y'),
-                'description': 'ATM CASH WITHDRAWAL',
-                'amount': 10000.0,
-                'formatted_amount': '₹10,000.00',
-                'type': 'debit',
-                'category': 'cash_withdrawal'
-            },
-            {
-                'date': (base_date + timedelta(days=5)).strftime('%Y-%m-%d'),
-                'formatted_date': (base_date + timedelta(days=5)).strftime('%d %b %Y'),
-                'description': 'NEFT-RENT PAYMENT',
-                'amount': 25000.0,
-                'formatted_amount': '₹25,000.00',
-                'type': 'debit',
-                'category': 'utilities'
-            },
-            {
-                'date': (base_date + timedelta(days=7)).strftime('%Y-%m-%d'),
-                'formatted_date': (base_date + timedelta(days=7)).strftime('%d %b %Y'),
-                'description': 'ELECTRICITY BILL PAYMENT',
-                'amount': 1800.0,
-                'formatted_amount': '₹1,800.00',
-                'type': 'debit',
-                'category': 'utilities'
-            },
-        ]
\ No newline at end of file
+        return [dict(transaction) for transaction in _sample_transactions(date.today())]
@@ -0,0 +1,46 @@
+"""
+Disk cache for Gemini PDF parsing results
+Entries are keyed by a SHA-256 over the model, prompt version and PDF bytes,
+so re-uploading the same statement skips the Gemini API call
+"""
+
+import os
+import hashlib
+from pathlib import Path
+from typing import List, Dict, Any, Optional
+
+from cache import FileCache
+
+CACHE_DIR = Path(os.getenv('GEMINI_CACHE_DIR', Path.home() / '.cache' / 'financ_advisor' / 'gemini'))
+
+# Cached results expire after 7 days
+DEFAULT_TTL = 7 * 24 * 60 * 60
+
+# Bump to invalidate every entry when the key layout changes
+KEY_VERSION = b'v1'
+
+_cache = FileCache(CACHE_DIR, default_ttl=DEFAULT_TTL)
+
+
+def make_key(model_name: str, prompt_version: str, pdf_bytes: bytes, use_vision: bool) -> str:
+    """Build the cache key for a PDF parse request"""
+    key = hashlib.sha256(KEY_VERSION)
+
+    # Length-prefix the variable-length fields so distinct tuples cannot collide
+    for field in (model_name.encode(), prompt_version.encode()):
+        key.update(len(field).to_bytes(8, 'big'))
+        key.update(field)
+
+    key.update(b'\x01' if use_vision else b'\x00')
+    key.update(hashlib.sha256(pdf_bytes).digest())
+    return key.hexdigest()
+
+
+def get(key: str) -> Optional[List[Dict[str, Any]]]:
+    """Return the cached transactions for key, or None on a miss or expired entry"""
+    return _cache.get(key)
+
+
+def set(key: str, value: List[Dict[str, Any]], ttl: int = DEFAULT_TTL):
+    """Store transactions for key"""
+    _cache.set(key, value, ttl)
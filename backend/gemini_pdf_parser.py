@@ -4,44 +4,274 @@ Uses Google's Gemini API to extract transaction data from PDFs
 """
 
 import os
+import re
 import json
+import hashlib
+import random
+import asyncio
 import logging
-from typing import List, Dict, Any
-from datetime import datetime
+import threading
+from typing import List, Dict, Any, Literal, Optional, Tuple
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+from multiprocessing import get_context
+from pathlib import Path
+
+import gemini_cache
+from transaction_record import format_amount
+from pdf_backends import pymupdf, PyPDF2, PYMUPDF_AVAILABLE, PYPDF2_AVAILABLE, PDF_AVAILABLE
 
 logger = logging.getLogger(__name__)
 
 try:
     import google.generativeai as genai
+    from google.api_core import exceptions as google_exceptions
     GEMINI_AVAILABLE = True
+    
+    # Rate limiting (429) and transient server errors are retried with backoff
+    RETRYABLE_ERRORS = (
+        google_exceptions.ResourceExhausted,
+        google_exceptions.TooManyRequests,
+        google_exceptions.InternalServerError,
+        google_exceptions.ServiceUnavailable,
+        google_exceptions.DeadlineExceeded,
+    )
 except ImportError:
     logger.warning("Google Generative AI not available. Install with: pip install google-generativeai")
     GEMINI_AVAILABLE = False
+    RETRYABLE_ERRORS = ()
 
 try:
-    import PyPDF2
-    PDF_AVAILABLE = True
+    import orjson
+    ORJSON_AVAILABLE = True
 except ImportError:
-    PDF_AVAILABLE = False
+    ORJSON_AVAILABLE = False
+
+# orjson.JSONDecodeError subclasses json.JSONDecodeError, so callers catch the latter
+_json_loads = orjson.loads if ORJSON_AVAILABLE else json.loads
+
+try:
+    from aiolimiter import AsyncLimiter
+    AIOLIMITER_AVAILABLE = True
+except ImportError:
+    AIOLIMITER_AVAILABLE = False
+
+try:
+    import pandas as pd
+    PANDAS_AVAILABLE = True
+except ImportError:
+    logger.warning("pandas not available. Gemini transactions will be validated one at a time.")
+    PANDAS_AVAILABLE = False
+
+try:
+    from pydantic import BaseModel, PositiveFloat, TypeAdapter, ValidationError, field_validator
+    PYDANTIC_AVAILABLE = True
+except ImportError:
+    logger.warning("pydantic not available. Gemini responses will be validated in Python.")
+    PYDANTIC_AVAILABLE = False
+
+GEMINI_MODEL = 'gemini-1.5-flash'
+
+# Part of the response cache key; bump whenever either prompt changes
+PROMPT_VERSION = '1'
+
+# Statement pages sent per Gemini request; requests run concurrently
+PAGES_PER_REQUEST = 1
+MAX_RETRIES = 6
+
+# Gemini requests allowed per minute, shared by every parser in the process
+GEMINI_RPM = int(os.getenv('GEMINI_RPM', '60'))
+
+# Extra Gemini calls allowed when a response fails validation
+VALIDATION_RETRIES = 2
+
+# Text extraction prompt, split around the statement text once at import
+_PROMPT_HEAD, _PROMPT_TAIL = """
+You are a bank statement parser. Extract ALL transactions from the following bank statement text.
+
+For each transaction, extract:
+1. Date (convert to YYYY-MM-DD format)
+2. Description (the transaction details/narration)
+3. Amount (as a positive number)
+4. Type (either "credit" or "debit")
+5. Category (choose from: salary, groceries, fuel, food_dining, utilities, medical, shopping, transfer, cash_withdrawal, loan, others)
+
+IMPORTANT RULES:
+- Extract EVERY transaction you find
+- If amount appears in "Debit" column, type is "debit"
+- If amount appears in "Credit" column, type is "credit"
+- Balance amounts are NOT transactions - ignore them
+- UPI transactions are usually "transfer" category
+- Salary/income is "salary" category
+- ATM withdrawals are "cash_withdrawal" category
+
+Return ONLY a valid JSON array with this exact structure (no markdown, no explanation):
+[
+  {
+    "date": "YYYY-MM-DD",
+    "description": "transaction description",
+    "amount": 1234.56,
+    "type": "credit",
+    "category": "salary"
+  }
+]
+
+Bank Statement Text:
+{text}
+
+JSON Array:""".split('{text}')
+
+# Statements without any of these words are not sent to Gemini
+_BANK_TEXT_RE = re.compile(r'credit|debit|balance|transaction', re.IGNORECASE)
+
+# Re-upload a cached File API upload this long before it expires
+UPLOAD_EXPIRY_MARGIN = timedelta(minutes=10)
+
+
+
+@lru_cache(maxsize=4096)
+def _format_dates(date_obj: datetime) -> Tuple[str, str]:
+    """ISO and display forms of a date; a statement repeats a few dates many times"""
+    return date_obj.strftime('%Y-%m-%d'), date_obj.strftime('%d %b %Y')
+
+
+def _format_transaction(date_obj: datetime, description: str, amount: float,
+                        txn_type: str, category: Optional[str], bank: str) -> Dict[str, Any]:
+    """Build the transaction dictionary returned to callers"""
+    iso_date, formatted_date = _format_dates(date_obj)
+    return {
+        'date': iso_date,
+        'formatted_date': formatted_date,
+        'description': description,
+        'amount': amount,
+        'formatted_amount': format_amount(amount),
+        'type': txn_type,
+        'category': category,
+        'bank': bank
+    }
+
+_configured_api_key = None
+_configure_lock = threading.Lock()
+
+_event_loop = None
+_event_loop_lock = threading.Lock()
+
+
+class _TokenBucket:
+    """Async token bucket used when aiolimiter is not installed"""
+    
+    def __init__(self, max_rate: float, time_period: float = 60):
+        self.max_rate = max_rate
+        self.rate = max_rate / time_period
+        self.tokens = max_rate
+        self.updated = None
+    
+    async def acquire(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            now = loop.time()
+            if self.updated is not None:
+                self.tokens = min(self.max_rate, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return
+            await asyncio.sleep((1 - self.tokens) / self.rate)
+    
+    async def __aenter__(self):
+        await self.acquire()
+    
+    async def __aexit__(self, *exc_info):
+        return None
+
+
+def _make_rate_limiter(rpm: int):
+    """Per-minute limiter for Gemini requests"""
+    return AsyncLimiter(rpm, 60) if AIOLIMITER_AVAILABLE else _TokenBucket(rpm, 60)
+
+
+# Smooths bursts from parallel page requests to just under the per-minute quota;
+# every Gemini call in a process runs on the shared event loop, so one limiter
+# covers them all. parse_directory workers each get a share of GEMINI_RPM
+_rate_limiter = _make_rate_limiter(GEMINI_RPM)
+
+
+def _configure_genai(api_key: str):
+    """Configure genai once per API key.
+    
+    genai.configure() discards the cached service clients along with their
+    open gRPC channels, so configuring on every parser construction forced
+    a new TCP/TLS handshake per statement.
+    """
+    global _configured_api_key
+    with _configure_lock:
+        if api_key != _configured_api_key:
+            genai.configure(api_key=api_key)
+            _configured_api_key = api_key
+
+
+def _run_async(coro):
+    """Run a coroutine on the shared background event loop and wait for it.
+    
+    The genai async client binds to the loop it is first used on, so every
+    call goes through one long-lived loop instead of asyncio.run().
+    """
+    global _event_loop
+    with _event_loop_lock:
+        if _event_loop is None:
+            _event_loop = asyncio.new_event_loop()
+            threading.Thread(target=_event_loop.run_forever, name='gemini-async', daemon=True).start()
+    return asyncio.run_coroutine_threadsafe(coro, _event_loop).result()
+
+
+if PYDANTIC_AVAILABLE:
+    class GeminiTransaction(BaseModel):
+        """A transaction as returned by Gemini"""
+        date: datetime
+        description: str
+        amount: PositiveFloat
+        type: Literal['credit', 'debit']
+        category: Optional[str] = 'others'
+        
+        @field_validator('date', mode='before')
+        @classmethod
+        def _parse_date(cls, value):
+            if not isinstance(value, str):
+                raise ValueError('date must be a YYYY-MM-DD string')
+            return datetime.strptime(value, '%Y-%m-%d')
+        
+        @field_validator('description', mode='before')
+        @classmethod
+        def _truncate_description(cls, value):
+            return str(value)[:200]
+    
+    # Validates a whole response in pydantic-core rather than row by row in Python
+    _TRANSACTIONS_ADAPTER = TypeAdapter(List[GeminiTransaction])
 
 
 class GeminiPDFParser:
     """AI-powered PDF parser using Google Gemini"""
     
-    def __init__(self, api_key: str = None):
+    # File API uploads keyed by SHA-256 of the PDF bytes, shared by all parsers
+    _upload_cache: Dict[str, Any] = {}
+    _upload_lock = threading.Lock()
+    
+    def __init__(self, api_key: str = None, max_concurrency: int = 5):
         """
         Initialize Gemini parser
         
         Args:
             api_key: Google Gemini API key. If None, reads from environment variable GEMINI_API_KEY
+            max_concurrency: Maximum number of Gemini requests in flight at once
         """
         self.api_key = api_key or os.getenv('GEMINI_API_KEY')
+        self.max_concurrency = max_concurrency
         self.model = None
         
         if GEMINI_AVAILABLE and self.api_key:
             try:
-                genai.configure(api_key=self.api_key)
-                self.model = genai.GenerativeModel('gemini-1.5-flash')
+                _configure_genai(self.api_key)
+                self.model = genai.GenerativeModel(GEMINI_MODEL)
                 logger.info("✅ Gemini AI parser initialized successfully")
             except Exception as e:
                 logger.error(f"Failed to initialize Gemini: {e}")
@@ -73,15 +303,30 @@ class GeminiPDFParser:
         try:
             logger.info(f"Using Gemini AI to parse PDF: {filepath}")
             
-            # Extract text from PDF
-            text = self._extract_text_from_pdf(filepath)
+            # Identical statements are answered from the response cache
+            with open(filepath, 'rb') as file:
+                pdf_bytes = file.read()
+            cache_key = self._cache_key(pdf_bytes, use_vision=False)
+            transactions = gemini_cache.get(cache_key)
+            if transactions is not None:
+                logger.info(f"Gemini cache hit: {len(transactions)} transactions")
+                return transactions
+            
+            # Extract text from PDF, one string per page
+            pages = self._extract_pages_from_pdf(filepath)
             
-            if not text or len(text.strip()) < 50:
+            if sum(len(page.strip()) for page in pages) < 50:
                 logger.warning("Insufficient text extracted from PDF")
                 return []
             
+            if not any(_BANK_TEXT_RE.search(page) for page in pages):
+                logger.warning("PDF does not look like a bank statement, skipping Gemini")
+                return []
+            
             # Use Gemini to extract transactions
-            transactions = self._extract_with_gemini(text)
+            transactions = self._extract_with_gemini_parallel(pages)
+            if transactions:
+                gemini_cache.set(cache_key, transactions)
             
             logger.info(f"Gemini extracted {len(transactions)} transactions")
             return transactions
@@ -90,127 +335,119 @@ class GeminiPDFParser:
             logger.error(f"Error in Gemini PDF parsing: {e}")
             return []
     
-    def _extract_text_from_pdf(self, filepath: str) -> str:
-        """Extract text from PDF file"""
-        if not PDF_AVAILABLE:
-            return ""
+    def _cache_key(self, pdf_bytes: bytes, use_vision: bool) -> str:
+        """Response cache key for a PDF and parsing mode"""
+        return gemini_cache.make_key(GEMINI_MODEL, PROMPT_VERSION, pdf_bytes, use_vision)
+    
+    def _upload_pdf(self, filepath: str, pdf_bytes: bytes):
+        """Upload a PDF to the File API, reusing an earlier upload of the same bytes until it expires"""
+        digest = hashlib.sha256(pdf_bytes).hexdigest()
+        now = datetime.now(timezone.utc)
         
-        text = ""
+        with self._upload_lock:
+            uploaded_file = self._upload_cache.get(digest)
+        if uploaded_file is not None and uploaded_file.expiration_time > now + UPLOAD_EXPIRY_MARGIN:
+            return uploaded_file
+        
+        uploaded_file = genai.upload_file(filepath)
+        
+        with self._upload_lock:
+            # Gemini deletes uploads when they expire, so expired entries are just dropped
+            for key in [k for k, f in self._upload_cache.items() if f.expiration_time <= now]:
+                del self._upload_cache[key]
+            self._upload_cache[digest] = uploaded_file
+        return uploaded_file
+    
+    def _extract_pages_from_pdf(self, filepath: str) -> List[str]:
+        """Extract the text of each PDF page"""
+        if PYMUPDF_AVAILABLE:
+            # MuPDF's C text extractor is much faster than PyPDF2's pure Python one
+            try:
+                with pymupdf.open(filepath) as doc:
+                    return [page.get_text() for page in doc]
+            except Exception as e:
+                logger.error(f"Error extracting text with PyMuPDF: {e}")
+                if not PYPDF2_AVAILABLE:
+                    return []
+        elif not PYPDF2_AVAILABLE:
+            return []
+        
+        pages = []
         try:
             with open(filepath, 'rb') as file:
                 pdf_reader = PyPDF2.PdfReader(file)
                 for page in pdf_reader.pages:
-                    text += page.extract_text() + "\n"
+                    pages.append(page.extract_text() or '')
         except Exception as e:
             logger.error(f"Error extracting text from PDF: {e}")
         
-        return text
+        return pages
+    
+    def _extract_with_gemini_parallel(self, pages: List[str]) -> List[Dict[str, Any]]:
+        """Send chunks of pages to Gemini concurrently and merge the transactions in page order"""
+        chunks = ['\n'.join(pages[i:i + PAGES_PER_REQUEST]) for i in range(0, len(pages), PAGES_PER_REQUEST)]
+        chunks = [chunk for chunk in chunks if chunk.strip()]
+        
+        async def extract_all():
+            semaphore = asyncio.Semaphore(self.max_concurrency)
+            return await asyncio.gather(*(self._extract_with_gemini(chunk, semaphore) for chunk in chunks))
+        
+        results = _run_async(extract_all())
+        return [txn for transactions in results for txn in transactions]
+    
+    async def _generate_with_backoff(self, contents):
+        """Call Gemini, retrying rate-limit and server errors with exponential backoff"""
+        for attempt in range(MAX_RETRIES):
+            try:
+                async with _rate_limiter:
+                    return await self.model.generate_content_async(contents)
+            except RETRYABLE_ERRORS as e:
+                if attempt == MAX_RETRIES - 1:
+                    raise
+                delay = 2 ** attempt + random.random()
+                logger.warning(f"Gemini request failed ({e}), retrying in {delay:.1f}s")
+                await asyncio.sleep(delay)
     
-    def _extract_with_gemini(self, text: str) -> List[Dict[str, Any]]:
+    async def _extract_with_gemini(self, text: str, semaphore: asyncio.Semaphore) -> List[Dict[str, Any]]:
         """Use Gemini AI to extract transaction data"""
+        base_prompt = prompt = _PROMPT_HEAD + text + _PROMPT_TAIL
         
-        prompt = f"""
-You are a bank statement parser. Extract ALL transactions from the following bank statement text.
-
-For each transaction, extract:
-1. Date (convert to YYYY-MM-DD format)
-2. Description (the transaction details/narration)
-3. Amount (as a positive number)
-4. Type (either "credit" or "debit")
-5. Category (choose from: salary, groceries, fuel, food_dining, utilities, medical, shopping, transfer, cash_withdrawal, loan, others)
-
-IMPORTANT RULES:
-- Extract EVERY transaction you find
-- If amount appears in "Debit" column, type is "debit"
-- If amount appears in "Credit" column, type is "credit"
-- Balance amounts are NOT transactions - ignore them
-- UPI transactions are usually "transfer" category
-- Salary/income is "salary" category
-- ATM withdrawals are "cash_withdrawal" category
-
-Return ONLY a valid JSON array with this exact structure (no markdown, no explanation):
-[
-  {{
-    "date": "YYYY-MM-DD",
-    "description": "transaction description",
-    "amount": 1234.56,
-    "type": "credit",
-    "category": "salary"
-  }}
-]
-
-Bank Statement Text:
-{text}
-
-JSON Array:"""
-
+        response_text = ''
         try:
-            response = self.model.generate_content(prompt)
-            response_text = response.text.strip()
-            
-            # Remove markdown code blocks if present
-            if response_text.startswith('```'):
-                # Remove ```json or ``` at start
-                response_text = response_text.split('\n', 1)[1] if '\n' in response_text else response_text[3:]
-                # Remove ``` at end
-                if response_text.endswith('```'):
-                    response_text = response_text[:-3]
-            
-            response_text = response_text.strip()
-            
-            # Parse JSON
-            transactions_raw = json.loads(response_text)
-            
-            # Validate and format transactions
-            transactions = []
-            for txn in transactions_raw:
+            for attempt in range(VALIDATION_RETRIES + 1):
+                async with semaphore:
+                    response = await self._generate_with_backoff(prompt)
+                response_text = response.text.strip()
+                
+                # Remove markdown code blocks if present
+                if response_text.startswith('```'):
+                    # Remove ```json or ``` at start
+                    response_text = response_text.split('\n', 1)[1] if '\n' in response_text else response_text[3:]
+                    # Remove ``` at end
+                    if response_text.endswith('```'):
+                        response_text = response_text[:-3]
+                
+                response_text = response_text.strip()
+                
+                if not PYDANTIC_AVAILABLE:
+                    return self._validate_transactions(_json_loads(response_text))
+                
                 try:
-                    # Validate required fields
-                    if not all(k in txn for k in ['date', 'description', 'amount', 'type']):
-                        logger.warning(f"Skipping transaction with missing fields: {txn}")
+                    validated = _TRANSACTIONS_ADAPTER.validate_json(response_text)
+                except ValidationError as e:
+                    if attempt < VALIDATION_RETRIES:
+                        # Feed the errors back so Gemini can correct its output
+                        logger.warning(f"Gemini response failed validation ({e.error_count()} errors), retrying")
+                        prompt = f"{base_prompt}\n\nYour previous output had errors: {e}\nFix them and return only the corrected JSON array."
                         continue
                     
-                    # Parse and validate date
-                    try:
-                        date_obj = datetime.strptime(txn['date'], '%Y-%m-%d')
-                    except:
-                        logger.warning(f"Invalid date format: {txn['date']}")
-                        continue
-                    
-                    # Validate amount
-                    try:
-                        amount = float(txn['amount'])
-                        if amount <= 0:
-                            logger.warning(f"Invalid amount: {amount}")
-                            continue
-                    except:
-                        logger.warning(f"Invalid amount format: {txn['amount']}")
-                        continue
-                    
-                    # Validate type
-                    if txn['type'] not in ['credit', 'debit']:
-                        logger.warning(f"Invalid type: {txn['type']}")
-                        continue
-                    
-                    # Format transaction
-                    formatted_txn = {
-                        'date': date_obj.strftime('%Y-%m-%d'),
-                        'formatted_date': date_obj.strftime('%d %b %Y'),
-                        'description': str(txn['description'])[:200],
-                        'amount': amount,
-                        'formatted_amount': f"₹{amount:,.2f}",
-                        'type': txn['type'],
-                        'category': txn.get('category', 'others'),
-                        'bank': 'Extracted by AI'
-                    }
-                    
-                    transactions.append(formatted_txn)
-                    
-                except Exception as e:
-                    logger.warning(f"Error processing transaction: {e}")
-                    continue
-            
-            return transactions
+                    # Out of retries: keep the rows that are valid on their own
+                    return self._validate_transactions(_json_loads(response_text))
+                
+                return [
+                    _format_transaction(txn.date, txn.description, txn.amount, txn.type, txn.category, 'Extracted by AI')
+                    for txn in validated
+                ]
             
         except json.JSONDecodeError as e:
             logger.error(f"Failed to parse Gemini response as JSON: {e}")
@@ -220,6 +457,88 @@ JSON Array:"""
             logger.error(f"Error calling Gemini API: {e}")
             return []
     
+    def _validate_transactions(self, transactions_raw: List[Any], bank: str = 'Extracted by AI') -> List[Dict[str, Any]]:
+        """Validate and format Gemini transactions, skipping invalid rows"""
+        if PANDAS_AVAILABLE:
+            return self._validate_transactions_frame(transactions_raw, bank)
+        
+        transactions = []
+        for txn in transactions_raw:
+            try:
+                # Validate required fields
+                if not all(k in txn for k in ['date', 'description', 'amount', 'type']):
+                    logger.warning(f"Skipping transaction with missing fields: {txn}")
+                    continue
+                
+                # Parse and validate date
+                try:
+                    date_obj = datetime.strptime(txn['date'], '%Y-%m-%d')
+                except:
+                    logger.warning(f"Invalid date format: {txn['date']}")
+                    continue
+                
+                # Validate amount
+                try:
+                    amount = float(txn['amount'])
+                    if amount <= 0:
+                        logger.warning(f"Invalid amount: {amount}")
+                        continue
+                except:
+                    logger.warning(f"Invalid amount format: {txn['amount']}")
+                    continue
+                
+                # Validate type
+                if txn['type'] not in ['credit', 'debit']:
+                    logger.warning(f"Invalid type: {txn['type']}")
+                    continue
+                
+                # Format transaction
+                formatted_txn = _format_transaction(
+                    date_obj, str(txn['description'])[:200], amount,
+                    txn['type'], txn.get('category', 'others'), bank
+                )
+                
+                transactions.append(formatted_txn)
+                
+            except Exception as e:
+                logger.warning(f"Error processing transaction: {e}")
+                continue
+        
+        return transactions
+    
+    def _validate_transactions_frame(self, transactions_raw: List[Any], bank: str) -> List[Dict[str, Any]]:
+        """Validate and format Gemini transactions column-wise with pandas"""
+        required = ['date', 'description', 'amount', 'type']
+        df = pd.DataFrame([txn for txn in transactions_raw if isinstance(txn, dict)])
+        if df.empty or not all(column in df.columns for column in required):
+            if transactions_raw:
+                logger.warning("Gemini response has no complete transactions")
+            return []
+        df = df.dropna(subset=required)
+        
+        # Invalid dates and amounts become NaT/NaN and fail the mask
+        dates = pd.to_datetime(df['date'], format='%Y-%m-%d', errors='coerce')
+        amounts = pd.to_numeric(df['amount'], errors='coerce')
+        valid = dates.notna() & (amounts > 0) & df['type'].isin(['credit', 'debit'])
+        
+        skipped = len(transactions_raw) - int(valid.sum())
+        if skipped:
+            logger.warning(f"Skipping {skipped} invalid transactions from Gemini")
+        
+        df, dates, amounts = df[valid], dates[valid], amounts[valid].astype(float)
+        category = df['category'].where(df['category'].notna(), 'others') if 'category' in df.columns else 'others'
+        
+        return pd.DataFrame({
+            'date': dates.dt.strftime('%Y-%m-%d'),
+            'formatted_date': dates.dt.strftime('%d %b %Y'),
+            'description': df['description'].astype(str).str[:200],
+            'amount': amounts,
+            'formatted_amount': '₹' + amounts.map('{:,.2f}'.format),
+            'type': df['type'],
+            'category': category,
+            'bank': bank
+        }).to_dict('records')
+    
     def parse_with_image(self, filepath: str) -> List[Dict[str, Any]]:
         """
         Parse bank statement PDF by sending it as an image to Gemini Vision
@@ -238,8 +557,16 @@ JSON Array:"""
         try:
             logger.info(f"Using Gemini Vision to parse PDF: {filepath}")
             
-            # Upload the PDF file
-            uploaded_file = genai.upload_file(filepath)
+            with open(filepath, 'rb') as file:
+                pdf_bytes = file.read()
+            cache_key = self._cache_key(pdf_bytes, use_vision=True)
+            transactions = gemini_cache.get(cache_key)
+            if transactions is not None:
+                logger.info(f"Gemini cache hit: {len(transactions)} transactions")
+                return transactions
+            
+            # Upload the PDF file, or reuse the upload of an identical one
+            uploaded_file = self._upload_pdf(filepath, pdf_bytes)
             
             prompt = """
 Analyze this bank statement PDF and extract ALL transactions.
@@ -262,7 +589,7 @@ Return ONLY a JSON array (no markdown):
 [{"date": "YYYY-MM-DD", "description": "...", "amount": 123.45, "type": "credit", "category": "salary"}]
 """
             
-            response = self.model.generate_content([uploaded_file, prompt])
+            response = _run_async(self._generate_with_backoff([uploaded_file, prompt]))
             response_text = response.text.strip()
             
             # Clean response
@@ -274,42 +601,10 @@ Return ONLY a JSON array (no markdown):
             response_text = response_text.strip()
             
             # Parse and validate
-            transactions_raw = json.loads(response_text)
-            transactions = []
-            
-            for txn in transactions_raw:
-                try:
-                    if not all(k in txn for k in ['date', 'description', 'amount', 'type']):
-                        continue
-                    
-                    date_obj = datetime.strptime(txn['date'], '%Y-%m-%d')
-                    amount = float(txn['amount'])
-                    
-                    if amount <= 0 or txn['type'] not in ['credit', 'debit']:
-                        continue
-                    
-                    formatted_txn = {
-                        'date': date_obj.strftime('%Y-%m-%d'),
-                        'formatted_date': date_obj.strftime('%d %b %Y'),
-                        'description': str(txn['description'])[:200],
-                        'amount': amount,
-                        'formatted_amount': f"₹{amount:,.2f}",
-                        'type': txn['type'],
-                        'category': txn.get('category', 'others'),
-                        'bank': 'Extracted by AI Vision'
-                    }
-                    
-                    transactions.append(formatted_txn)
-                    
-                except Exception as e:
-                    logger.warning(f"Error processing transaction: {e}")
-                    continue
+            transactions = self._validate_transactions(_json_loads(response_text), 'Extracted by AI Vision')
             
-            # Clean up uploaded file
-            try:
-                genai.delete_file(uploaded_file.name)
-            except:
-                pass
+            if transactions:
+                gemini_cache.set(cache_key, transactions)
             
             logger.info(f"Gemini Vision extracted {len(transactions)} transactions")
             return transactions
@@ -338,3 +633,52 @@ def parse_with_gemini(filepath: str, api_key: str = None, use_vision: bool = Fal
         return parser.parse_with_image(filepath)
     else:
         return parser.parse_pdf(filepath)
+
+
+def _init_worker(rpm: int):
+    """Pool initializer: start from a clean event loop and genai configuration.
+    
+    Each worker limits itself to rpm so the pool as a whole stays within GEMINI_RPM.
+    """
+    global _event_loop, _configured_api_key, _rate_limiter
+    _event_loop = None
+    _configured_api_key = None
+    _rate_limiter = _make_rate_limiter(rpm)
+
+
+def _parse_one(args: Tuple[str, Optional[str], bool]) -> Tuple[str, List[Dict[str, Any]]]:
+    """Pool worker: parse one PDF, never letting a failure stop the batch"""
+    path, api_key, use_vision = args
+    try:
+        return path, parse_with_gemini(path, api_key, use_vision)
+    except Exception as e:
+        logger.error(f"Error parsing {path}: {e}")
+        return path, []
+
+
+def parse_directory(dir_path: str, workers: int = 4, api_key: str = None,
+                    use_vision: bool = False) -> Dict[str, List[Dict[str, Any]]]:
+    """
+    Parse every PDF in a directory using a pool of worker processes
+    
+    Args:
+        dir_path: Directory containing bank statement PDFs
+        workers: Number of worker processes
+        api_key: Gemini API key (optional, reads from env if not provided)
+        use_vision: If True, uses Gemini Vision for each file
+        
+    Returns:
+        Dictionary mapping each PDF path to its transactions (empty on failure)
+    """
+    files = sorted(str(path) for path in Path(dir_path).glob('*.pdf'))
+    if not files:
+        return {}
+    
+    api_key = api_key or os.getenv('GEMINI_API_KEY')
+    tasks = [(path, api_key, use_vision) for path in files]
+    workers = min(workers, len(files))
+    # Spawn rather than fork: a forked child would inherit the background event
+    # loop without the thread running it, plus gRPC channels that are not fork-safe
+    with get_context('spawn').Pool(workers, initializer=_init_worker,
+                                   initargs=(max(1, GEMINI_RPM // workers),)) as pool:
+        return dict(pool.imap_unordered(_parse_one, tasks))
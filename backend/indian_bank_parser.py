@@ -3,40 +3,140 @@ Specialized parser for Indian Bank statements
 Handles the specific format used by Indian Bank
 """
 
+import os
 import re
 import logging
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
 from typing import List, Dict, Any
 
 logger = logging.getLogger(__name__)
 
+# UPI transactions are split by merchant before the general categories apply
+UPI_FOOD_KEYWORDS = ['swiggy', 'zomato', 'food']
+UPI_SHOPPING_KEYWORDS = ['amazon', 'flipkart', 'shopping']
+
+# General category keywords, checked in priority order
+CATEGORY_KEYWORDS = [
+    ('salary', ['salary', 'pay', 'income']),
+    ('cash_withdrawal', ['atm', 'cash', 'withdrawal']),
+    ('groceries', ['grocery', 'supermarket']),
+    ('fuel', ['fuel', 'petrol', 'gas']),
+    ('utilities', ['electricity', 'water', 'utility', 'bill', 'rent']),
+    ('medical', ['medical', 'hospital', 'pharmacy']),
+    ('transfer', ['transfer', 'neft', 'imps', 'rtgs']),
+]
+
+
+def _build_categorizer():
+    """Compile the keyword tables into one flat if-chain of substring tests.
+    
+    The rules are static, so generating the function once at import leaves
+    only literal `in` checks per call, with no loops, generators or automaton.
+    """
+    def any_of(words):
+        return ' or '.join(f'{word!r} in desc' for word in words)
+    
+    lines = [
+        'def categorize(desc):',
+        "    if 'upi' in desc:",
+        f"        if {any_of(UPI_FOOD_KEYWORDS)}: return 'food_dining'",
+        f"        if {any_of(UPI_SHOPPING_KEYWORDS)}: return 'shopping'",
+        "        return 'transfer'",
+    ]
+    for category, words in CATEGORY_KEYWORDS:
+        lines.append(f'    if {any_of(words)}: return {category!r}')
+    lines.append("    return 'others'")
+    
+    namespace = {}
+    exec('\n'.join(lines), namespace)
+    return namespace['categorize']
+
+# Maps a lowercased description to its category
+_categorize_lower = _build_categorizer()
+
+# Transaction type for a Debit | Credit | Balance row, keyed by which of the
+# debit and credit columns are non-zero; a row with both is taken as a debit.
+# Rows with neither carry no transaction and are skipped before the lookup
+_TYPE_BY_COLUMNS = {
+    (True, False): 'debit',
+    (False, True): 'credit',
+    (True, True): 'debit',
+}
+
+# Below this many transaction lines, process start-up costs more than it saves
+_PARALLEL_LINE_THRESHOLD = 10000
+
+
+def _parse_chunk(lines: List[str]) -> List[Dict[str, Any]]:
+    """Parse a slice of transaction lines in a worker process"""
+    return IndianBankParser()._parse_lines(lines)
+
+
 class IndianBankParser:
     """Parser specifically for Indian Bank statement format"""
     
     def __init__(self):
         self.date_pattern = r'(\d{1,2}\s+(?:Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec)\s+\d{4})'
         
+        # Compiled once; applied to every statement line
+        self._date_re = re.compile(self.date_pattern)
+        self._inr_re = re.compile(r'INR\s+([\d,]+\.?\d*)')
+        self._trailing_sign_re = re.compile(r'[-+\s]+$')
+        
     def parse_text(self, text: str) -> List[Dict[str, Any]]:
         """Parse Indian Bank statement text"""
-        transactions = []
-        
         # Split into lines
         lines = text.split('\n')
         
-        # Find the start of transaction data (after "ACCOUNT ACTIVITY")
-        in_transactions = False
+        # Transaction data starts after "ACCOUNT ACTIVITY"
+        start = self._find_activity_start(lines)
+        transactions = self._parse_lines(lines[start:]) if start is not None else []
+        
+        logger.info(f"Indian Bank Parser: Extracted {len(transactions)} transactions")
+        return transactions
+    
+    def parse_text_parallel(self, text: str, workers: int = 4) -> List[Dict[str, Any]]:
+        """Parse Indian Bank statement text, splitting long statements across worker processes"""
+        lines = text.split('\n')
+        start = self._find_activity_start(lines)
+        if start is None:
+            return []
+        
+        body = lines[start:]
+        workers = min(workers, os.cpu_count() or 1)
+        if len(body) < _PARALLEL_LINE_THRESHOLD or workers < 2:
+            transactions = self._parse_lines(body)
+        else:
+            # Lines are independent once the activity section is found, so
+            # contiguous slices can be parsed separately and concatenated
+            step = -(-len(body) // workers)
+            chunks = [body[i:i + step] for i in range(0, len(body), step)]
+            with ProcessPoolExecutor(max_workers=len(chunks)) as executor:
+                transactions = [txn for result in executor.map(_parse_chunk, chunks) for txn in result]
+        
+        logger.info(f"Indian Bank Parser: Extracted {len(transactions)} transactions")
+        return transactions
+    
+    def _find_activity_start(self, lines: List[str]):
+        """Index of the first line after the "ACCOUNT ACTIVITY" marker, or None"""
+        return next((i + 1 for i, line in enumerate(lines) if 'ACCOUNT ACTIVITY' in line.upper()), None)
+    
+    def _parse_lines(self, lines: List[str]) -> List[Dict[str, Any]]:
+        """Parse the transaction lines that follow the activity marker"""
+        transactions = []
         
         for i, line in enumerate(lines):
+            # A transaction line always carries INR amounts; this also skips
+            # blank lines before any stripping or case folding
+            if 'INR' not in line:
+                continue
+            
             line = line.strip()
             
+            # Skip repeated section markers and the header line
             if 'ACCOUNT ACTIVITY' in line.upper():
-                in_transactions = True
                 continue
-            
-            if not in_transactions or not line:
-                continue
-            
-            # Skip header line
             if 'Date' in line and 'Transaction Details' in line:
                 continue
             
@@ -45,14 +145,13 @@ class IndianBankParser:
             if transaction:
                 transactions.append(transaction)
         
-        logger.info(f"Indian Bank Parser: Extracted {len(transactions)} transactions")
         return transactions
     
     def _parse_transaction_line(self, line: str, all_lines: List[str], line_idx: int) -> Dict[str, Any]:
         """Parse a single transaction line"""
         
         # Extract date
-        date_match = re.search(self.date_pattern, line)
+        date_match = self._date_re.search(line)
         if not date_match:
             return None
         
@@ -64,15 +163,15 @@ class IndianBankParser:
             return None
         
         # Extract amounts (look for INR followed by numbers)
-        amounts = []
-        inr_pattern = r'INR\s+([\d,]+\.?\d*)'
-        for match in re.finditer(inr_pattern, line):
+        # Zero values are kept in `columns` so an empty Debit or Credit column
+        # (printed as INR 0.00) still tells the two apart
+        columns = []
+        for value in self._inr_re.findall(line):
             try:
-                amount = float(match.group(1).replace(',', ''))
-                if amount > 0:
-                    amounts.append(amount)
+                columns.append(float(value.replace(',', '')))
             except:
                 continue
+        amounts = [amount for amount in columns if amount > 0]
         
         if not amounts:
             return None
@@ -83,25 +182,17 @@ class IndianBankParser:
         is_credit = False
         is_debit = False
         
-        # Split by INR to analyze structure
-        parts = re.split(r'INR', line)
-        
-        # If we have 3 INR amounts: Debit, Credit, Balance
-        if len(amounts) == 3:
-            debit_amount = amounts[0]
-            credit_amount = amounts[1]
+        # If we have 3 INR columns: Debit, Credit, Balance
+        if len(columns) == 3:
+            debit_amount = columns[0]
+            credit_amount = columns[1]
+            if debit_amount <= 0 and credit_amount <= 0:
+                return None
             
-            if debit_amount > 0 and credit_amount == 0:
-                is_debit = True
-                transaction_amount = debit_amount
-            elif credit_amount > 0 and debit_amount == 0:
-                is_credit = True
-                transaction_amount = credit_amount
-            else:
-                # Use the non-zero one
-                transaction_amount = debit_amount if debit_amount > 0 else credit_amount
-                is_debit = debit_amount > 0
-                is_credit = credit_amount > 0
+            column_type = _TYPE_BY_COLUMNS[(debit_amount > 0, credit_amount > 0)]
+            is_debit = column_type == 'debit'
+            is_credit = not is_debit
+            transaction_amount = debit_amount if is_debit else credit_amount
         
         # If we have 2 INR amounts: Transaction and Balance
         elif len(amounts) == 2:
@@ -139,7 +230,7 @@ class IndianBankParser:
             description = "Transaction"
         
         # Clean up description
-        description = re.sub(r'[-+\s]+$', '', description).strip()
+        description = self._trailing_sign_re.sub('', description).strip()
         
         if not description or len(description) < 3:
             description = "Bank Transaction"
@@ -162,31 +253,4 @@ class IndianBankParser:
     
     def _categorize(self, description: str) -> str:
         """Categorize transaction based on description"""
-        desc_lower = description.lower()
-        
-        # UPI transactions
-        if 'upi' in desc_lower:
-            if any(word in desc_lower for word in ['swiggy', 'zomato', 'food']):
-                return 'food_dining'
-            elif any(word in desc_lower for word in ['amazon', 'flipkart', 'shopping']):
-                return 'shopping'
-            else:
-                return 'transfer'
-        
-        # Common categories
-        if any(word in desc_lower for word in ['salary', 'pay', 'income']):
-            return 'salary'
-        elif any(word in desc_lower for word in ['atm', 'cash', 'withdrawal']):
-            return 'cash_withdrawal'
-        elif any(word in desc_lower for word in ['grocery', 'supermarket']):
-            return 'groceries'
-        elif any(word in desc_lower for word in ['fuel', 'petrol', 'gas']):
-            return 'fuel'
-        elif any(word in desc_lower for word in ['electricity', 'water', 'utility', 'bill', 'rent']):
-            return 'utilities'
-        elif any(word in desc_lower for word in ['medical', 'hospital', 'pharmacy']):
-            return 'medical'
-        elif any(word in desc_lower for word in ['transfer', 'neft', 'imps', 'rtgs']):
-            return 'transfer'
-        else:
-            return 'others'
+        return _categorize_lower(description.lower())
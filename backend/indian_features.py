@@ -1,100 +1,283 @@
 import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional
+from typing import Dict, List, NamedTuple, Optional
 import logging
+from functools import lru_cache
+from math import expm1, log1p
+
+from indian_kernels import (
+    emi_kernel, remaining_principal_kernel, sip_kernel, fd_kernel, loan_comparison_kernel
+)
 
 logger = logging.getLogger(__name__)
 
+# DataFrame inputs are converted to typed NumPy columns before any math; where a
+# per-row loop is unavoidable, zip over those arrays (or use
+# itertuples(index=False, name=None)) rather than iterrows(), which builds a
+# Series for every row
+
+# Calculator results are tuples: much cheaper to build than dicts in comparison
+# loops; to_dict() gives the JSON form at the API boundary
+
+class TaxResult(NamedTuple):
+    annual_income: float
+    taxable_income: float
+    tax_before_cess: float
+    cess: float
+    total_tax: float
+    standard_deduction: float
+    deduction_80c: float
+    hra_exemption: float
+    tax_regime: str
+    savings_vs_other_regime: float  # Positive means the chosen regime saves money
+    
+    @property
+    def effective_tax_rate(self) -> float:
+        return (self.total_tax / self.annual_income) * 100
+    
+    @property
+    def total_deductions(self) -> float:
+        return self.standard_deduction + self.deduction_80c + self.hra_exemption
+    
+    def to_dict(self) -> Dict:
+        return {
+            'annual_income': self.annual_income,
+            'taxable_income': self.taxable_income,
+            'tax_before_cess': self.tax_before_cess,
+            'cess': self.cess,
+            'total_tax': self.total_tax,
+            'effective_tax_rate': self.effective_tax_rate,
+            'deductions': {
+                'standard_deduction': self.standard_deduction,
+                '80c_deduction': self.deduction_80c,
+                'hra_exemption': self.hra_exemption,
+                'total_deductions': self.total_deductions
+            },
+            'tax_regime': self.tax_regime,
+            'savings_vs_other_regime': self.savings_vs_other_regime
+        }
+
+class SIPResult(NamedTuple):
+    monthly_sip: float
+    total_invested: float
+    future_value: float
+    returns: float
+    years: int
+    annual_return: float
+    
+    @property
+    def return_percentage(self) -> float:
+        return (self.returns / self.total_invested) * 100
+    
+    def to_dict(self) -> Dict:
+        return {
+            'monthly_sip': self.monthly_sip,
+            'total_invested': self.total_invested,
+            'future_value': self.future_value,
+            'returns': self.returns,
+            'return_percentage': self.return_percentage,
+            'years': self.years,
+            'annual_return_assumed': self.annual_return * 100
+        }
+
+class FDResult(NamedTuple):
+    principal: float
+    maturity_amount: float
+    interest_earned: float
+    rate: float
+    years: float
+    
+    @property
+    def effective_yield(self) -> float:
+        return (self.interest_earned / self.principal) * 100
+    
+    def to_dict(self) -> Dict:
+        return {
+            'principal': self.principal,
+            'maturity_amount': self.maturity_amount,
+            'interest_earned': self.interest_earned,
+            'rate': self.rate * 100,
+            'years': self.years,
+            'effective_yield': self.effective_yield
+        }
+
+class EMIResult(NamedTuple):
+    principal: float
+    emi: float
+    tenure_months: int
+    total_payment: float
+    total_interest: float
+    interest_rate: float
+    
+    @property
+    def tenure_years(self) -> float:
+        return self.tenure_months / 12
+    
+    @property
+    def interest_percentage(self) -> float:
+        return (self.total_interest / self.principal) * 100
+    
+    def to_dict(self) -> Dict:
+        return {
+            'principal': self.principal,
+            'emi': self.emi,
+            'tenure_months': self.tenure_months,
+            'tenure_years': self.tenure_years,
+            'total_payment': self.total_payment,
+            'total_interest': self.total_interest,
+            'interest_rate': self.interest_rate,
+            'interest_percentage': self.interest_percentage
+        }
+
+# Income tax slabs as (upper limit, rate)
+TAX_SLABS_OLD = (
+    (250000, 0), (500000, 0.05), (1000000, 0.20), (float('inf'), 0.30)
+)
+TAX_SLABS_NEW = (
+    (300000, 0), (600000, 0.05), (900000, 0.10), (1200000, 0.15),
+    (1500000, 0.20), (float('inf'), 0.30)
+)
+
+def _build_slab_arrays(slabs: tuple) -> tuple:
+    """Turn (upper limit, rate) slabs into a piecewise-linear lookup table.
+    
+    Returns each slab's lower threshold, its rate and the tax due at the
+    threshold, so tax is one lookup plus intercept + rate * (income - threshold).
+    """
+    rates = np.array([rate for _, rate in slabs], dtype=np.float64)
+    thresholds = np.array([0.0] + [limit for limit, _ in slabs[:-1]], dtype=np.float64)
+    intercepts = np.concatenate(([0.0], np.cumsum(rates[:-1] * np.diff(thresholds))))
+    
+    # Shared by every TaxPlanner, so guard against accidental mutation
+    for array in (thresholds, rates, intercepts):
+        array.setflags(write=False)
+    return thresholds, rates, intercepts
+
+# Built once at import rather than per TaxPlanner
+_SLAB_ARRAYS = {
+    'old': _build_slab_arrays(TAX_SLABS_OLD),
+    'new': _build_slab_arrays(TAX_SLABS_NEW)
+}
+
+def _stack_regimes() -> tuple:
+    """Old (row 0) and new (row 1) lookup tables padded to one 2 x K shape"""
+    width = max(len(TAX_SLABS_OLD), len(TAX_SLABS_NEW))
+    
+    # Padding thresholds are never reached, so the padding rates are never used
+    padding = (np.inf, 0.0, 0.0)
+    stacked = []
+    for column, pad in zip(zip(_SLAB_ARRAYS['old'], _SLAB_ARRAYS['new']), padding):
+        table = np.array([np.pad(row, (0, width - len(row)), constant_values=pad) for row in column])
+        table.setflags(write=False)
+        stacked.append(table)
+    return tuple(stacked)
+
+# Lets calculate_tax price both regimes in a single NumPy pass
+_REGIME_THRESHOLDS, _REGIME_RATES, _REGIME_INTERCEPTS = _stack_regimes()
+_REGIME_ROWS = np.arange(2)
+
 class TaxPlanner:
     """Indian tax planning with 80C, HRA, capital gains"""
     
     def __init__(self):
-        self.tax_slabs_old = [
-            (250000, 0), (500000, 0.05), (1000000, 0.20), (float('inf'), 0.30)
-        ]
-        self.tax_slabs_new = [
-            (300000, 0), (600000, 0.05), (900000, 0.10), (1200000, 0.15),
-            (1500000, 0.20), (float('inf'), 0.30)
-        ]
+        self.tax_slabs_old = TAX_SLABS_OLD
+        self.tax_slabs_new = TAX_SLABS_NEW
         
         self.section_80c_limit = 150000
         self.hra_exemption_rates = {'metro': 0.50, 'non_metro': 0.40}
+        
+        # Dashboards and what-if sliders repeat the same inputs, so results are memoized
+        self._compute_tax = lru_cache(maxsize=4096)(self._compute_tax)
     
     def calculate_tax(self, annual_income: float, investments_80c: float = 0, 
                      hra_received: float = 0, rent_paid: float = 0, 
-                     is_metro: bool = True, regime: str = 'old') -> Dict:
+                     is_metro: bool = True, regime: str = 'old') -> TaxResult:
         """Calculate income tax with deductions"""
         
-        # Choose tax regime
-        slabs = self.tax_slabs_old if regime == 'old' else self.tax_slabs_new
+        old, new = self._compute_tax(annual_income, investments_80c, hra_received, rent_paid, is_metro)
+        current, other = (old, new) if regime == 'old' else (new, old)
+        standard_deduction, deduction_80c, hra_exemption, taxable_income, tax = current
+        
+        # Health and education cess (4%)
+        cess = tax * 0.04
+        total_tax = tax + cess
+        
+        other_tax = other[4] + other[4] * 0.04
+        
+        return TaxResult(
+            annual_income, taxable_income, tax, cess, total_tax,
+            standard_deduction, deduction_80c, hra_exemption,
+            regime, other_tax - total_tax
+        )
+    
+    def calculate_tax_vectorized(self, incomes: np.ndarray, investments_80c: float = 0,
+                                 hra_received: float = 0, rent_paid: float = 0,
+                                 is_metro: bool = True, regime: str = 'old') -> np.ndarray:
+        """Total tax (including cess) for an array of annual incomes in one pass"""
+        
+        incomes = np.asarray(incomes, dtype=np.float64)
+        deductions = 50000.0
+        
+        if regime == 'old':
+            deductions += min(investments_80c, self.section_80c_limit)
+            
+            if hra_received > 0 and rent_paid > 0:
+                basic_salary = incomes * 0.5
+                rate = self.hra_exemption_rates['metro' if is_metro else 'non_metro']
+                hra_exemption = np.minimum(np.minimum(hra_received, rent_paid - basic_salary * 0.10), basic_salary * rate)
+                deductions = deductions + np.maximum(hra_exemption, 0.0)
+        
+        taxable_income = np.maximum(incomes - deductions, 0.0)
+        
+        thresholds, rates, intercepts = _SLAB_ARRAYS['old' if regime == 'old' else 'new']
+        slab = np.searchsorted(thresholds, taxable_income, side='right') - 1
+        return (intercepts[slab] + rates[slab] * (taxable_income - thresholds[slab])) * 1.04
+    
+    def _compute_deductions(self, income: float, inv_80c: float, hra: float, rent: float,
+                            metro: bool, regime: str) -> tuple:
+        """Standard deduction, 80C deduction and HRA exemption for a regime"""
         
         # Standard deduction
         standard_deduction = 50000 if regime == 'old' else 50000
         
         # 80C deductions (only for old regime)
-        deduction_80c = min(investments_80c, self.section_80c_limit) if regime == 'old' else 0
+        deduction_80c = min(inv_80c, self.section_80c_limit) if regime == 'old' else 0
         
         # HRA exemption (only for old regime)
         hra_exemption = 0
-        if regime == 'old' and hra_received > 0 and rent_paid > 0:
-            basic_salary = annual_income * 0.5  # Assume 50% is basic
-            rate = self.hra_exemption_rates['metro' if is_metro else 'non_metro']
+        if regime == 'old' and hra > 0 and rent > 0:
+            basic_salary = income * 0.5  # Assume 50% is basic
+            rate = self.hra_exemption_rates['metro' if metro else 'non_metro']
             
             hra_exemption = min(
-                hra_received,
-                rent_paid - (basic_salary * 0.10),
+                hra,
+                rent - (basic_salary * 0.10),
                 basic_salary * rate
             )
             hra_exemption = max(0, hra_exemption)
         
-        # Taxable income
-        taxable_income = annual_income - standard_deduction - deduction_80c - hra_exemption
-        taxable_income = max(0, taxable_income)
-        
-        # Calculate tax
-        tax = 0
-        remaining_income = taxable_income
-        
-        for i, (limit, rate) in enumerate(slabs):
-            if remaining_income <= 0:
-                break
-            
-            prev_limit = slabs[i-1][0] if i > 0 else 0
-            taxable_in_slab = min(remaining_income, limit - prev_limit)
-            
-            tax += taxable_in_slab * rate
-            remaining_income -= taxable_in_slab
+        return standard_deduction, deduction_80c, hra_exemption
+    
+    def _compute_tax(self, income: float, inv_80c: float, hra: float, rent: float, metro: bool) -> tuple:
+        """(deductions, taxable income, tax before cess) for the old and the new regime.
         
-        # Health and education cess (4%)
-        cess = tax * 0.04
-        total_tax = tax + cess
+        Deductions differ per regime, but both taxes come from one NumPy pass
+        over the stacked slab tables.
+        """
+        old_deductions = self._compute_deductions(income, inv_80c, hra, rent, metro, 'old')
+        new_deductions = self._compute_deductions(income, inv_80c, hra, rent, metro, 'new')
         
-        return {
-            'annual_income': annual_income,
-            'taxable_income': taxable_income,
-            'tax_before_cess': tax,
-            'cess': cess,
-            'total_tax': total_tax,
-            'effective_tax_rate': (total_tax / annual_income) * 100,
-            'deductions': {
-                'standard_deduction': standard_deduction,
-                '80c_deduction': deduction_80c,
-                'hra_exemption': hra_exemption,
-                'total_deductions': standard_deduction + deduction_80c + hra_exemption
-            },
-            'tax_regime': regime,
-            'savings_vs_other_regime': self._compare_regimes(annual_income, investments_80c, hra_received, rent_paid, is_metro, regime)
-        }
-    
-    def _compare_regimes(self, income: float, inv_80c: float, hra: float, rent: float, metro: bool, current: str) -> float:
-        """Compare tax between old and new regime"""
-        other_regime = 'new' if current == 'old' else 'old'
+        # Taxable income
+        old_taxable = max(0, income - old_deductions[0] - old_deductions[1] - old_deductions[2])
+        new_taxable = max(0, income - new_deductions[0] - new_deductions[1] - new_deductions[2])
         
-        current_tax = self.calculate_tax(income, inv_80c, hra, rent, metro, current)['total_tax']
-        other_tax = self.calculate_tax(income, inv_80c, hra, rent, metro, other_regime)['total_tax']
+        taxable = np.array([[old_taxable], [new_taxable]], dtype=np.float64)
+        slab = (taxable >= _REGIME_THRESHOLDS).sum(axis=1) - 1
+        lower = _REGIME_THRESHOLDS[_REGIME_ROWS, slab]
+        old_tax, new_tax = (_REGIME_INTERCEPTS[_REGIME_ROWS, slab] + _REGIME_RATES[_REGIME_ROWS, slab] * (taxable[:, 0] - lower)).tolist()
         
-        return other_tax - current_tax  # Positive means current regime saves money
+        return (*old_deductions, old_taxable, old_tax), (*new_deductions, new_taxable, new_tax)
     
     def calculate_capital_gains(self, purchase_price: float, sale_price: float, 
                               purchase_date: datetime, sale_date: datetime, 
@@ -135,6 +318,42 @@ class TaxPlanner:
             'holding_period_days': holding_period,
             'effective_rate': (tax / gain) * 100 if gain > 0 else 0
         }
+    
+    def calculate_capital_gains_batch(self, purchase_prices: np.ndarray, sale_prices: np.ndarray,
+                                      purchase_dates: pd.DatetimeIndex, sale_dates: pd.DatetimeIndex,
+                                      asset_types: np.ndarray) -> pd.DataFrame:
+        """Capital gains tax for many trades at once, one row per trade"""
+        
+        purchase_prices = np.asarray(purchase_prices, dtype=np.float64)
+        sale_prices = np.asarray(sale_prices, dtype=np.float64)
+        holding_period = np.asarray((pd.DatetimeIndex(sale_dates) - pd.DatetimeIndex(purchase_dates)).days)
+        gain = sale_prices - purchase_prices
+        
+        is_equity = np.asarray(asset_types) == 'equity'
+        is_long_term = np.where(is_equity, holding_period > 365, holding_period > 1095)
+        
+        tax = np.select(
+            [gain <= 0, is_equity & is_long_term, is_equity, is_long_term],
+            [
+                0.0,
+                np.maximum(0, gain - 100000) * 0.10,  # Equity LTCG above 1 lakh at 10%
+                gain * 0.15,  # Equity STCG at 15%
+                np.maximum(0, sale_prices - purchase_prices * 1.05) * 0.20  # Indexed LTCG at 20%
+            ],
+            gain * 0.30  # Other short term gains at slab rate
+        )
+        gain_type = np.select([gain <= 0, is_long_term], ['loss', 'long_term'], 'short_term')
+        
+        with np.errstate(divide='ignore', invalid='ignore'):
+            effective_rate = np.where(gain > 0, tax / gain * 100, 0.0)
+        
+        return pd.DataFrame({
+            'gain': gain,
+            'tax': tax,
+            'type': gain_type,
+            'holding_period_days': holding_period,
+            'effective_rate': effective_rate
+        })
 
 class GSTTracker:
     """GST tracking for business expenses"""
@@ -180,20 +399,18 @@ class GSTTracker:
         if expenses_df.empty:
             return {'total_gst': 0, 'breakdown': {}}
         
-        total_gst = 0
-        category_gst = {}
+        # Typed arrays up front: an object-dtype amount column (e.g. JSON input)
+        # would dispatch every arithmetic op back to Python
+        amounts = expenses_df['amount'].to_numpy(dtype=np.float64, copy=False)
+        if 'category' in expenses_df:
+            categories = expenses_df['category'].fillna('other').to_numpy()
+        else:
+            categories = np.full(len(amounts), 'other', dtype=object)
         
-        for _, expense in expenses_df.iterrows():
-            # Assume 18% GST for business expenses
-            gst_calc = self.calculate_gst(expense['amount'], 0.18, True)
-            gst_amount = gst_calc['gst_amount']
-            
-            total_gst += gst_amount
-            category = expense.get('category', 'other')
-            
-            if category not in category_gst:
-                category_gst[category] = 0
-            category_gst[category] += gst_amount
+        # Assume 18% GST, included in the amount, for business expenses
+        gst = amounts * (0.18 / 1.18)
+        total_gst = float(gst.sum())
+        category_gst = pd.Series(gst).groupby(categories, sort=False).sum().to_dict()
         
         return {
             'total_gst_paid': total_gst,
@@ -210,47 +427,22 @@ class InvestmentTracker:
         self.ppf_rate = 0.071  # Current PPF rate
     
     def calculate_sip_returns(self, monthly_amount: float, annual_return: float, 
-                            years: int) -> Dict:
+                            years: int) -> SIPResult:
         """Calculate SIP returns"""
         
-        months = years * 12
-        monthly_rate = annual_return / 12
-        
         # Future value of SIP
-        if monthly_rate > 0:
-            future_value = monthly_amount * (((1 + monthly_rate) ** months - 1) / monthly_rate) * (1 + monthly_rate)
-        else:
-            future_value = monthly_amount * months
-        
-        total_invested = monthly_amount * months
-        returns = future_value - total_invested
+        total_invested, future_value, returns = sip_kernel(monthly_amount, annual_return, years)
         
-        return {
-            'monthly_sip': monthly_amount,
-            'total_invested': total_invested,
-            'future_value': future_value,
-            'returns': returns,
-            'return_percentage': (returns / total_invested) * 100,
-            'years': years,
-            'annual_return_assumed': annual_return * 100
-        }
+        return SIPResult(monthly_amount, total_invested, future_value, returns, years, annual_return)
     
     def calculate_fd_returns(self, principal: float, rate: float, years: float, 
-                           compound_frequency: int = 4) -> Dict:
+                           compound_frequency: int = 4) -> FDResult:
         """Calculate FD returns with quarterly compounding"""
         
         # Compound interest formula
-        amount = principal * (1 + rate / compound_frequency) ** (compound_frequency * years)
-        interest = amount - principal
+        amount, interest = fd_kernel(principal, rate, years, compound_frequency)
         
-        return {
-            'principal': principal,
-            'maturity_amount': amount,
-            'interest_earned': interest,
-            'rate': rate * 100,
-            'years': years,
-            'effective_yield': (interest / principal) * 100
-        }
+        return FDResult(principal, amount, interest, rate, years)
     
     def calculate_ppf_returns(self, annual_contribution: float, years: int = 15) -> Dict:
         """Calculate PPF returns (15-year lock-in)"""
@@ -259,13 +451,11 @@ class InvestmentTracker:
             years = 15  # Minimum PPF tenure
         
         rate = self.ppf_rate
-        total_contribution = 0
-        balance = 0
+        contribution = min(annual_contribution, 150000)  # PPF limit
+        total_contribution = contribution * years
         
-        for year in range(years):
-            contribution = min(annual_contribution, 150000)  # PPF limit
-            total_contribution += contribution
-            balance = (balance + contribution) * (1 + rate)
+        # Future value of yearly contributions made at the start of each year
+        balance = contribution * (expm1(years * log1p(rate)) / rate) * (1 + rate)
         
         returns = balance - total_contribution
         
@@ -280,30 +470,42 @@ class InvestmentTracker:
             '80c_benefit': min(total_contribution, 150000 * years)
         }
     
+    def calculate_ppf_returns_batch(self, contributions: np.ndarray, years: np.ndarray) -> np.ndarray:
+        """PPF maturity amounts for arrays of annual contributions and tenures"""
+        contributions = np.minimum(np.asarray(contributions, dtype=np.float64), 150000)
+        years = np.maximum(np.asarray(years), 15)
+        rate = self.ppf_rate
+        return contributions * (np.expm1(years * log1p(rate)) / rate) * (1 + rate)
+    
     def portfolio_analysis(self, investments: List[Dict]) -> Dict:
         """Analyze investment portfolio"""
         
-        total_value = sum(inv['current_value'] for inv in investments)
-        total_invested = sum(inv['invested_amount'] for inv in investments)
+        # One array per field, so every statistic below is a single C-level reduction
+        count = len(investments)
+        current_values = np.fromiter((inv['current_value'] for inv in investments), dtype=np.float64, count=count)
+        invested_amounts = np.fromiter((inv['invested_amount'] for inv in investments), dtype=np.float64, count=count)
+        
+        total_value = float(current_values.sum())
+        total_invested = float(invested_amounts.sum())
         
         if total_invested == 0:
             return {'error': 'No investments found'}
         
         # Asset allocation
-        allocation = {}
-        for inv in investments:
-            asset_type = inv['type']
-            if asset_type not in allocation:
-                allocation[asset_type] = 0
-            allocation[asset_type] += inv['current_value']
+        asset_types = [inv['type'] for inv in investments]
+        allocation = pd.Series(current_values).groupby(asset_types, sort=False).sum()
         
         # Convert to percentages
-        allocation_pct = {k: (v / total_value) * 100 for k, v in allocation.items()}
+        allocation_pct = (allocation / total_value * 100).to_dict()
         
         # Overall returns
         total_returns = total_value - total_invested
         return_pct = (total_returns / total_invested) * 100
         
+        # Holdings with nothing invested cannot be ranked by return
+        with np.errstate(divide='ignore', invalid='ignore'):
+            holding_returns = np.where(invested_amounts != 0, (current_values - invested_amounts) / invested_amounts, -np.inf)
+        
         return {
             'total_invested': total_invested,
             'current_value': total_value,
@@ -311,76 +513,58 @@ class InvestmentTracker:
             'return_percentage': return_pct,
             'asset_allocation': allocation_pct,
             'diversification_score': len(allocation),  # Simple diversification metric
-            'top_performer': max(investments, key=lambda x: (x['current_value'] - x['invested_amount']) / x['invested_amount'])['name']
+            'top_performer': investments[int(np.argmax(holding_returns))]['name']
         }
 
+# Tenure range searched by EMICalculator.optimal_loan_tenure
+MIN_LOAN_TENURE_MONTHS = 12
+MAX_LOAN_TENURE_MONTHS = 360
+
 class EMICalculator:
     """Loan planning and EMI optimization"""
     
-    def calculate_emi(self, principal: float, rate: float, tenure_months: int) -> Dict:
+    def calculate_emi(self, principal: float, rate: float, tenure_months: int) -> EMIResult:
         """Calculate EMI using standard formula"""
         
-        monthly_rate = rate / (12 * 100)
-        
-        if monthly_rate == 0:
-            emi = principal / tenure_months
-        else:
-            emi = principal * monthly_rate * (1 + monthly_rate) ** tenure_months / ((1 + monthly_rate) ** tenure_months - 1)
-        
-        total_payment = emi * tenure_months
-        total_interest = total_payment - principal
-        
-        return {
-            'principal': principal,
-            'emi': emi,
-            'tenure_months': tenure_months,
-            'tenure_years': tenure_months / 12,
-            'total_payment': total_payment,
-            'total_interest': total_interest,
-            'interest_rate': rate,
-            'interest_percentage': (total_interest / principal) * 100
-        }
+        emi, total_payment, total_interest = emi_kernel(principal, rate, tenure_months)
+        return EMIResult(principal, emi, tenure_months, total_payment, total_interest, rate)
     
     def loan_comparison(self, principal: float, options: List[Dict]) -> List[Dict]:
         """Compare multiple loan options"""
         
-        comparisons = []
+        if not options:
+            return []
         
-        for option in options:
-            emi_calc = self.calculate_emi(
-                principal, 
-                option['rate'], 
-                option['tenure_months']
-            )
-            
-            emi_calc.update({
-                'bank': option.get('bank', 'Unknown'),
-                'loan_type': option.get('type', 'Personal')
-            })
-            
-            comparisons.append(emi_calc)
+        rates = np.array([option['rate'] for option in options], dtype=np.float64)
+        tenures = np.array([option['tenure_months'] for option in options], dtype=np.int64)
+        emis, total_payments, total_interests = loan_comparison_kernel(float(principal), rates, tenures)
         
         # Sort by total interest (lowest first)
-        comparisons.sort(key=lambda x: x['total_interest'])
+        comparisons = []
+        for i in np.argsort(total_interests, kind='stable'):
+            option = options[i]
+            comparison = EMIResult(
+                principal, float(emis[i]), option['tenure_months'],
+                float(total_payments[i]), float(total_interests[i]), option['rate']
+            ).to_dict()
+            comparison['bank'] = option.get('bank', 'Unknown')
+            comparison['loan_type'] = option.get('type', 'Personal')
+            comparisons.append(comparison)
         
         return comparisons
     
     def prepayment_analysis(self, principal: float, rate: float, tenure_months: int, 
-                          prepayment_amount: float, prepayment_month: int) -> Dict:
-        """Analyze impact of prepayment"""
+                          prepayment_amount: float, prepayment_month: int,
+                          *, original: Optional[EMIResult] = None) -> Dict:
+        """Analyze impact of prepayment; pass `original` if the loan's EMI is already known"""
         
         # Original loan
-        original = self.calculate_emi(principal, rate, tenure_months)
+        if original is None:
+            original = self.calculate_emi(principal, rate, tenure_months)
         
         # Calculate remaining principal at prepayment month
-        monthly_rate = rate / (12 * 100)
-        emi = original['emi']
-        
-        remaining_principal = principal
-        for month in range(prepayment_month):
-            interest_component = remaining_principal * monthly_rate
-            principal_component = emi - interest_component
-            remaining_principal -= principal_component
+        emi = original.emi
+        remaining_principal = remaining_principal_kernel(principal, rate, emi, prepayment_month)
         
         # New loan after prepayment
         new_principal = remaining_principal - prepayment_amount
@@ -389,47 +573,81 @@ class EMICalculator:
         if new_principal <= 0:
             return {
                 'loan_closed': True,
-                'savings': original['total_payment'] - (emi * prepayment_month + prepayment_amount)
+                'savings': original.total_payment - (emi * prepayment_month + prepayment_amount)
             }
         
-        new_loan = self.calculate_emi(new_principal, rate, new_tenure)
+        new_emi, new_total_payment, _ = emi_kernel(new_principal, rate, new_tenure)
         
         # Calculate savings
         original_remaining_payment = emi * new_tenure
-        new_total_payment = new_loan['total_payment']
         interest_savings = original_remaining_payment - new_total_payment
         
         return {
-            'original_loan': original,
+            'original_loan': original.to_dict(),
             'prepayment_amount': prepayment_amount,
             'prepayment_month': prepayment_month,
-            'new_emi': new_loan['emi'],
+            'new_emi': new_emi,
             'new_tenure_months': new_tenure,
             'interest_savings': interest_savings,
             'total_savings': interest_savings,
             'payback_months': prepayment_amount / interest_savings if interest_savings > 0 else float('inf')
         }
     
+    def prepayment_sweep(self, principal: float, rate: float, tenure_months: int,
+                         prepayment_amount: float, months: np.ndarray) -> np.ndarray:
+        """Savings from prepaying in each of `months`, to find the best prepayment timing"""
+        
+        months = np.asarray(months, dtype=np.float64)
+        monthly_rate = rate / (12 * 100)
+        emi = emi_kernel(principal, rate, tenure_months)[0]
+        
+        # Outstanding principal after each candidate month, then the loan left after prepaying
+        new_tenure = tenure_months - months
+        with np.errstate(divide='ignore', invalid='ignore'):
+            if monthly_rate == 0:
+                new_principal = principal - emi * months - prepayment_amount
+                new_emi = new_principal / new_tenure
+            else:
+                growth = np.expm1(months * log1p(monthly_rate))
+                new_principal = principal + principal * growth - emi * growth / monthly_rate - prepayment_amount
+                new_growth = np.expm1(new_tenure * log1p(monthly_rate))
+                new_emi = new_principal * monthly_rate * (new_growth + 1) / new_growth
+        
+        # A prepayment that closes the loan saves everything still owed
+        closed_savings = emi * tenure_months - (emi * months + prepayment_amount)
+        return np.where(new_principal <= 0, closed_savings, (emi - new_emi) * new_tenure)
+    
     def optimal_loan_tenure(self, principal: float, rate: float, max_emi: float) -> Dict:
         """Find optimal tenure based on EMI affordability"""
         
         monthly_rate = rate / (12 * 100)
         
-        if monthly_rate == 0:
-            optimal_tenure = int(principal / max_emi)
-        else:
-            # Solve for tenure using EMI formula
-            optimal_tenure = int(-np.log(1 - (principal * monthly_rate) / max_emi) / np.log(1 + monthly_rate))
+        # The interest alone would use up the whole EMI
+        if principal * monthly_rate >= max_emi:
+            return {'error': 'Loan is unaffordable at this EMI'}
+        
+        # Shortest whole-month tenure (1 to 30 years) whose EMI fits the budget;
+        # EMI falls as tenure grows, so bisection needs ~9 EMI evaluations
+        lo, hi = MIN_LOAN_TENURE_MONTHS, MAX_LOAN_TENURE_MONTHS
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if emi_kernel(principal, rate, mid)[0] <= max_emi:
+                hi = mid
+            else:
+                lo = mid + 1
+        optimal_tenure = lo
         
-        optimal_tenure = max(12, optimal_tenure)  # Minimum 1 year
+        # Even the longest tenure needs a larger EMI than the budget allows
+        if emi_kernel(principal, rate, optimal_tenure)[0] > max_emi:
+            return {'error': 'Loan is unaffordable at this EMI'}
         
         loan_details = self.calculate_emi(principal, rate, optimal_tenure)
         
         return {
             'optimal_tenure_months': optimal_tenure,
             'optimal_tenure_years': optimal_tenure / 12,
-            'emi': loan_details['emi'],
-            'total_interest': loan_details['total_interest'],
+            'emi': loan_details.emi,
+            'total_interest': loan_details.total_interest,
             'max_affordable_emi': max_emi,
-            'emi_utilization': (loan_details['emi'] / max_emi) * 100
+            'emi_utilization': (loan_details.emi / max_emi) * 100
         }
\ No newline at end of file
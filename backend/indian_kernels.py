@@ -0,0 +1,104 @@
+"""
+Numeric kernels for the Indian finance calculators
+Compiled with Numba when it is installed; otherwise the scalar kernels come
+from the optional Cython build in _indian_kernels.pyx, or run as plain Python
+"""
+
+import logging
+from math import expm1, log1p
+from typing import Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+    def njit(*args, **kwargs):
+        """Stand-in for numba.njit that returns the function unchanged"""
+        if len(args) == 1 and callable(args[0]):
+            return args[0]
+        return lambda func: func
+
+
+@njit(cache=True, fastmath=True)
+def emi_kernel(principal: float, rate: float, tenure_months: int) -> Tuple[float, float, float]:
+    """EMI, total payment and total interest for an annual rate in percent"""
+    monthly_rate = rate / (12 * 100)
+
+    if monthly_rate == 0:
+        emi = principal / tenure_months
+    else:
+        # (1 + r)^n - 1, computed without cancellation for small monthly rates
+        growth = expm1(tenure_months * log1p(monthly_rate))
+        emi = principal * monthly_rate * (growth + 1) / growth
+
+    total_payment = emi * tenure_months
+    return emi, total_payment, total_payment - principal
+
+
+@njit(cache=True, fastmath=True)
+def remaining_principal_kernel(principal: float, rate: float, emi: float, months: int) -> float:
+    """Outstanding principal after paying `months` EMIs"""
+    monthly_rate = rate / (12 * 100)
+
+    if monthly_rate == 0:
+        return principal - emi * months
+
+    growth = expm1(months * log1p(monthly_rate))
+    return principal + principal * growth - emi * growth / monthly_rate
+
+
+@njit(cache=True, fastmath=True)
+def sip_kernel(monthly_amount: float, annual_return: float, years: int) -> Tuple[float, float, float]:
+    """Total invested, future value and returns of a monthly SIP"""
+    months = years * 12
+    monthly_rate = annual_return / 12
+
+    if monthly_rate > 0:
+        future_value = monthly_amount * (expm1(months * log1p(monthly_rate)) / monthly_rate) * (1 + monthly_rate)
+    else:
+        future_value = monthly_amount * months
+
+    total_invested = monthly_amount * months
+    return total_invested, future_value, future_value - total_invested
+
+
+@njit(cache=True, fastmath=True)
+def fd_kernel(principal: float, rate: float, years: float, compound_frequency: int) -> Tuple[float, float]:
+    """Maturity amount and interest of a fixed deposit"""
+    interest = principal * expm1(compound_frequency * years * log1p(rate / compound_frequency))
+    return principal + interest, interest
+
+
+@njit(cache=True, fastmath=True)
+def loan_comparison_kernel(principal: float, rates: np.ndarray,
+                           tenures: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """EMI, total payment and total interest for each (rate, tenure) loan option"""
+    monthly_rates = rates / (12 * 100)
+    growth = np.expm1(tenures * np.log1p(monthly_rates))
+
+    # Zero-rate options take the plain principal / tenure branch; the guard only
+    # keeps the unused branch from dividing by zero
+    safe_growth = np.where(growth == 0, 1.0, growth)
+    emis = np.where(monthly_rates == 0, principal / tenures,
+                    principal * monthly_rates * (safe_growth + 1) / safe_growth)
+
+    total_payments = emis * tenures
+    return emis, total_payments, total_payments - principal
+
+
+# Without Numba, use the ahead-of-time Cython build of the scalar kernels if present
+CYTHON_KERNELS_AVAILABLE = False
+if not NUMBA_AVAILABLE:
+    try:
+        from _indian_kernels import (
+            emi_kernel, remaining_principal_kernel, sip_kernel, fd_kernel
+        )
+        CYTHON_KERNELS_AVAILABLE = True
+    except ImportError:
+        logger.warning("Neither numba nor the Cython kernels are available. Finance kernels will run as plain Python.")
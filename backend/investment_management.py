@@ -1,13 +1,103 @@
 import requests
 import sqlite3
-from datetime import datetime, timedelta
+import os
+from datetime import datetime, timedelta, timezone, time as dtime
+from pathlib import Path
 import json
+import time
+import asyncio
+import threading
+import numpy as np
 import pandas as pd
-from typing import Dict, List, Tuple
+from typing import Dict, List, Optional, Tuple
 import yfinance as yf
 from dataclasses import dataclass
+from contextlib import contextmanager
+from functools import lru_cache
 import logging
 
+from cache import FileCache
+
+# Quotes are reused for this many seconds before Yahoo is asked again
+PRICE_CACHE_TTL = 60
+
+# Tickers per yf.download request; yfinance fetches the tickers of one request on parallel threads
+PRICE_DOWNLOAD_CHUNK = 50
+
+# Process-wide caches shared by every tracker: ticker -> (price, fetched_at) and ticker -> yf.Ticker
+_price_cache: Dict[str, Tuple[float, float]] = {}
+_ticker_cache: Dict[str, yf.Ticker] = {}
+
+# Quotes also persist on disk so restarts do not go back to Yahoo; keyed by (ticker, period)
+YF_CACHE_DIR = Path(os.getenv('YF_CACHE_DIR', Path.home() / '.cache' / 'financ_advisor' / 'yf'))
+_quote_file_cache = FileCache(YF_CACHE_DIR)
+
+IST = timezone(timedelta(hours=5, minutes=30))
+NSE_OPEN = dtime(9, 15)
+NSE_CLOSE = dtime(15, 30)
+INTRADAY_QUOTE_TTL = 5 * 60
+AFTER_HOURS_QUOTE_TTL = 24 * 60 * 60
+
+def _quote_ttl() -> int:
+    """Seconds a quote stays valid on disk: short during NSE hours, until the next open otherwise"""
+    now = datetime.now(IST)
+    if now.weekday() < 5 and NSE_OPEN <= now.time() < NSE_CLOSE:
+        return INTRADAY_QUOTE_TTL
+    
+    next_open = datetime.combine(now.date(), NSE_OPEN, IST)
+    if now.time() >= NSE_OPEN:
+        next_open += timedelta(days=1)
+    while next_open.weekday() >= 5:
+        next_open += timedelta(days=1)
+    
+    seconds_to_open = (next_open - now).total_seconds()
+    return int(min(AFTER_HOURS_QUOTE_TTL, max(INTRADAY_QUOTE_TTL, seconds_to_open)))
+
+def _quote_key(ticker: str, period: str = '1d') -> str:
+    return f'{ticker}_{period}'
+
+def _cached_price(ticker: str, now: float):
+    """Return the cached price for ticker if it is still fresh, else None"""
+    entry = _price_cache.get(ticker)
+    if entry is not None and now - entry[1] < PRICE_CACHE_TTL:
+        return entry[0]
+    
+    cached = _quote_file_cache.get(_quote_key(ticker))
+    if cached is not None:
+        _price_cache[ticker] = (cached['price'], now)
+        return cached['price']
+    return None
+
+def _store_price(ticker: str, price: float, now: float):
+    _price_cache[ticker] = (price, now)
+    _quote_file_cache.set(_quote_key(ticker), {'price': price}, ttl=_quote_ttl())
+
+def _drop_price(ticker: str):
+    """Forget the cached quote for ticker in memory and on disk"""
+    _price_cache.pop(ticker, None)
+    _quote_file_cache.delete(_quote_key(ticker))
+
+def _connect(db_path: str) -> sqlite3.Connection:
+    """Open a long-lived autocommit connection in WAL mode"""
+    conn = sqlite3.connect(db_path, check_same_thread=False, isolation_level=None)
+    conn.execute('PRAGMA journal_mode=WAL')
+    conn.execute('PRAGMA synchronous=NORMAL')
+    conn.execute('PRAGMA temp_store=MEMORY')
+    conn.execute('PRAGMA mmap_size=268435456')
+    return conn
+
+@contextmanager
+def _transaction(conn: sqlite3.Connection, lock: threading.Lock):
+    """Run several writes as one transaction while holding the writer lock"""
+    with lock:
+        conn.execute('BEGIN')
+        try:
+            yield conn
+        except BaseException:
+            conn.execute('ROLLBACK')
+            raise
+        conn.execute('COMMIT')
+
 @dataclass
 class Investment:
     symbol: str
@@ -37,11 +127,13 @@ class Investment:
 class PortfolioTracker:
     def __init__(self, db_path: str):
         self.db_path = db_path
+        self.conn = _connect(db_path)
+        self._write_lock = threading.Lock()
+        self._pending_prices: List[Tuple[str, float, int]] = []
         self.init_db()
     
     def init_db(self):
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        cursor = self.conn.cursor()
         
         cursor.execute('''
             CREATE TABLE IF NOT EXISTS investments (
@@ -61,76 +153,221 @@ class PortfolioTracker:
                 id INTEGER PRIMARY KEY,
                 symbol TEXT NOT NULL,
                 price REAL NOT NULL,
-                timestamp TEXT NOT NULL
+                timestamp INTEGER NOT NULL
             )
         ''')
+        self._migrate_price_history(cursor)
         
-        conn.commit()
-        conn.close()
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_inv_symbol ON investments(symbol)')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_ph_sym_ts ON price_history(symbol, timestamp DESC)')
+    
+    def _migrate_price_history(self, cursor):
+        """Rebuild a price_history table created with ISO string timestamps to use epoch seconds"""
+        columns = {row[1]: row[2] for row in cursor.execute('PRAGMA table_info(price_history)')}
+        if columns.get('timestamp', '').upper() != 'TEXT':
+            return
+        
+        # A TEXT column would coerce integers back to strings, so copy into a new table.
+        # Old rows were written with local datetime.now(), hence the 'utc' modifier
+        with _transaction(self.conn, self._write_lock) as conn:
+            conn.execute('DROP INDEX IF EXISTS idx_ph_sym_ts')
+            conn.execute('ALTER TABLE price_history RENAME TO price_history_old')
+            conn.execute('''
+                CREATE TABLE price_history (
+                    id INTEGER PRIMARY KEY,
+                    symbol TEXT NOT NULL,
+                    price REAL NOT NULL,
+                    timestamp INTEGER NOT NULL
+                )
+            ''')
+            conn.execute('''
+                INSERT INTO price_history (id, symbol, price, timestamp)
+                SELECT id, symbol, price, CAST(strftime('%s', timestamp, 'utc') AS INTEGER)
+                FROM price_history_old
+            ''')
+            conn.execute('DROP TABLE price_history_old')
+    
+    @staticmethod
+    def _to_ticker(symbol: str) -> str:
+        # For Indian stocks, append .NS (NSE) or .BO (BSE)
+        return symbol if '.' in symbol else symbol + '.NS'
     
     def get_real_time_price(self, symbol: str) -> float:
         """Get real-time price using yfinance"""
         try:
-            # For Indian stocks, append .NS (NSE) or .BO (BSE)
-            if not ('.' in symbol):
-                symbol += '.NS'
+            symbol = self._to_ticker(symbol)
+            now = time.time()
+            price = _cached_price(symbol, now)
+            if price is not None:
+                return price
             
-            ticker = yf.Ticker(symbol)
+            ticker = _ticker_cache.get(symbol)
+            if ticker is None:
+                ticker = _ticker_cache[symbol] = yf.Ticker(symbol)
             data = ticker.history(period="1d")
             if not data.empty:
                 price = float(data['Close'].iloc[-1])
+                _store_price(symbol, price, now)
                 self.update_price_history(symbol, price)
+                self.flush_price_history()
                 return price
         except Exception as e:
             logging.error(f"Error fetching price for {symbol}: {e}")
         
         return 0.0
     
+    def get_real_time_prices(self, symbols: List[str]) -> Dict[str, float]:
+        """Get real-time prices for many symbols with batched yfinance downloads"""
+        tickers = {symbol: self._to_ticker(symbol) for symbol in symbols}
+        now = time.time()
+        
+        known = {}
+        for ticker in set(tickers.values()):
+            price = _cached_price(ticker, now)
+            if price is not None:
+                known[ticker] = price
+        
+        # Only tickers without a fresh quote go to Yahoo, PRICE_DOWNLOAD_CHUNK per request
+        stale = [ticker for ticker in dict.fromkeys(tickers.values()) if ticker not in known]
+        for start in range(0, len(stale), PRICE_DOWNLOAD_CHUNK):
+            chunk = stale[start:start + PRICE_DOWNLOAD_CHUNK]
+            fetched = self._download_prices(chunk)
+            if fetched is None:
+                continue
+            
+            for ticker, price in fetched.items():
+                _store_price(ticker, price, now)
+                self.update_price_history(ticker, price)
+            # Remember tickers Yahoo had no data for so they are not re-requested every call
+            for ticker in chunk:
+                if ticker not in fetched:
+                    _price_cache[ticker] = (0.0, now)
+            known.update(fetched)
+        
+        return {symbol: known.get(ticker, 0.0) for symbol, ticker in tickers.items()}
+    
+    async def fetch_prices(self, symbols: List[str]) -> Dict[str, float]:
+        """get_real_time_prices for asyncio callers; the blocking download runs in the default executor"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, self.get_real_time_prices, symbols)
+    
+    def _download_prices(self, tickers: List[str]) -> Optional[Dict[str, float]]:
+        """Last close for each ticker from one yfinance download, or None if the download failed"""
+        try:
+            data = yf.download(tickers=" ".join(tickers), period='1d',
+                               group_by='ticker', threads=True, progress=False)
+        except Exception as e:
+            logging.error(f"Error fetching prices for {tickers}: {e}")
+            return None
+        
+        fetched = {}
+        for ticker in tickers:
+            try:
+                # Older yfinance returns flat columns for a single ticker
+                if isinstance(data.columns, pd.MultiIndex):
+                    closes = data[ticker]['Close'].dropna()
+                else:
+                    closes = data['Close'].dropna()
+            except KeyError:
+                logging.error(f"No price data returned for {ticker}")
+                continue
+            if not closes.empty:
+                fetched[ticker] = float(closes.iloc[-1])
+        
+        return fetched
+    
     def update_price_history(self, symbol: str, price: float):
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        cursor.execute('''
-            INSERT INTO price_history (symbol, price, timestamp)
-            VALUES (?, ?, ?)
-        ''', (symbol, price, datetime.now().isoformat()))
-        conn.commit()
-        conn.close()
+        """Queue a price for the next flush_price_history"""
+        self._pending_prices.append((symbol, price, int(time.time())))
+    
+    def flush_price_history(self):
+        """Write all queued prices in a single transaction"""
+        with self._write_lock:
+            pending, self._pending_prices = self._pending_prices, []
+        if not pending:
+            return
+        
+        with _transaction(self.conn, self._write_lock) as conn:
+            conn.executemany('''
+                INSERT INTO price_history (symbol, price, timestamp)
+                VALUES (?, ?, ?)
+            ''', pending)
     
     def add_investment(self, symbol: str, name: str, quantity: float, 
                       avg_price: float, investment_type: str, purchase_date: str):
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        cursor.execute('''
-            INSERT INTO investments (symbol, name, quantity, avg_price, investment_type, purchase_date)
-            VALUES (?, ?, ?, ?, ?, ?)
-        ''', (symbol, name, quantity, avg_price, investment_type, purchase_date))
-        conn.commit()
-        conn.close()
+        with self._write_lock:
+            self.conn.execute('''
+                INSERT INTO investments (symbol, name, quantity, avg_price, investment_type, purchase_date)
+                VALUES (?, ?, ?, ?, ?, ?)
+            ''', (symbol, name, quantity, avg_price, investment_type, purchase_date))
+        
+        # Price a newly added holding from a fresh quote
+        _drop_price(self._to_ticker(symbol))
     
     def get_portfolio(self) -> List[Investment]:
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        cursor.execute('SELECT * FROM investments')
-        rows = cursor.fetchall()
-        conn.close()
+        rows = self.conn.execute('SELECT * FROM investments').fetchall()
+        
+        prices = self.get_real_time_prices([row[1] for row in rows])
+        self.flush_price_history()
         
         portfolio = []
         for row in rows:
-            current_price = self.get_real_time_price(row[1])
             investment = Investment(
                 symbol=row[1], name=row[2], quantity=row[3],
-                avg_price=row[4], current_price=current_price,
+                avg_price=row[4], current_price=prices[row[1]],
                 investment_type=row[5], purchase_date=row[6]
             )
             portfolio.append(investment)
         
         return portfolio
     
-    def get_portfolio_summary(self) -> Dict:
-        portfolio = self.get_portfolio()
+    def get_portfolio_frame(self) -> pd.DataFrame:
+        """Holdings as a DataFrame with current price, P&L and holding period columns"""
+        df = pd.read_sql(
+            'SELECT symbol, name, quantity, avg_price, investment_type, purchase_date FROM investments',
+            self.conn, dtype={'quantity': np.float64, 'avg_price': np.float64}
+        )
+        
+        prices = self.get_real_time_prices(df['symbol'].tolist())
+        self.flush_price_history()
+        
+        df['current_price'] = df['symbol'].map(prices).astype(np.float64)
+        df['invested_amount'] = df['quantity'] * df['avg_price']
+        df['current_value'] = df['quantity'] * df['current_price']
+        df['pnl'] = df['current_value'] - df['invested_amount']
+        
+        invested = df['invested_amount'].to_numpy()
+        df['pnl_percentage'] = np.divide(df['pnl'].to_numpy() * 100, invested,
+                                         out=np.zeros(len(df)), where=invested > 0)
+        
+        df['purchase_date'] = pd.to_datetime(df['purchase_date'], format='ISO8601')
+        df['holding_days'] = (pd.Timestamp.now() - df['purchase_date']).dt.days
+        return df
+    
+    def get_portfolio_summary(self, portfolio: pd.DataFrame = None) -> Dict:
+        """Portfolio totals, from an existing get_portfolio_frame snapshot if one is passed"""
+        if portfolio is not None:
+            total_invested = float(portfolio['invested_amount'].sum())
+            total_current = float(portfolio['current_value'].sum())
+            investments_count = len(portfolio)
+        else:
+            rows = self.conn.execute('''
+                SELECT symbol, SUM(quantity), SUM(quantity * avg_price), COUNT(*)
+                FROM investments
+                GROUP BY symbol
+            ''').fetchall()
+            
+            prices = self.get_real_time_prices([row[0] for row in rows])
+            self.flush_price_history()
+            
+            quantities = np.array([row[1] for row in rows], dtype=np.float64)
+            invested = np.array([row[2] for row in rows], dtype=np.float64)
+            current_prices = np.array([prices[row[0]] for row in rows], dtype=np.float64)
+            
+            total_invested = float(invested.sum())
+            total_current = float(quantities @ current_prices)
+            investments_count = sum(row[3] for row in rows)
         
-        total_invested = sum(inv.invested_amount for inv in portfolio)
-        total_current = sum(inv.current_value for inv in portfolio)
         total_pnl = total_current - total_invested
         
         return {
@@ -138,31 +375,36 @@ class PortfolioTracker:
             'total_current_value': total_current,
             'total_pnl': total_pnl,
             'total_pnl_percentage': (total_pnl / total_invested) * 100 if total_invested > 0 else 0,
-            'investments_count': len(portfolio)
+            'investments_count': investments_count
         }
 
 class AssetAllocator:
     def __init__(self, portfolio_tracker: PortfolioTracker):
         self.portfolio_tracker = portfolio_tracker
     
-    def get_current_allocation(self) -> Dict[str, float]:
-        portfolio = self.portfolio_tracker.get_portfolio()
-        total_value = sum(inv.current_value for inv in portfolio)
+    def get_current_allocation(self, portfolio: pd.DataFrame = None) -> Dict[str, float]:
+        if portfolio is None:
+            portfolio = self.portfolio_tracker.get_portfolio_frame()
         
-        allocation = {}
-        for inv in portfolio:
-            if inv.investment_type not in allocation:
-                allocation[inv.investment_type] = 0
-            allocation[inv.investment_type] += inv.current_value
+        by_type = portfolio.groupby('investment_type', sort=False)['current_value'].sum()
+        total_value = by_type.sum()
         
         # Convert to percentages
-        for asset_type in allocation:
-            allocation[asset_type] = (allocation[asset_type] / total_value) * 100 if total_value > 0 else 0
+        if total_value > 0:
+            by_type = by_type / total_value * 100
+        else:
+            by_type[:] = 0
         
-        return allocation
+        return {asset_type: float(pct) for asset_type, pct in by_type.items()}
     
     def get_target_allocation(self, age: int, risk_tolerance: str) -> Dict[str, float]:
         """Get target allocation based on age and risk tolerance"""
+        # Copy so callers cannot modify the cached allocation
+        return dict(self._target_allocation(age, risk_tolerance))
+    
+    @staticmethod
+    @lru_cache(maxsize=256)
+    def _target_allocation(age: int, risk_tolerance: str) -> Dict[str, float]:
         equity_percentage = 100 - age  # Basic rule: 100 - age for equity
         
         if risk_tolerance == 'conservative':
@@ -176,8 +418,10 @@ class AssetAllocator:
             'etf': 100 - equity_percentage  # Rest in ETFs/bonds
         }
     
-    def get_rebalancing_suggestions(self, age: int, risk_tolerance: str) -> List[Dict]:
-        current = self.get_current_allocation()
+    def get_rebalancing_suggestions(self, age: int, risk_tolerance: str,
+                                    current: Dict[str, float] = None) -> List[Dict]:
+        if current is None:
+            current = self.get_current_allocation()
         target = self.get_target_allocation(age, risk_tolerance)
         
         suggestions = []
@@ -200,11 +444,12 @@ class AssetAllocator:
 class SIPManager:
     def __init__(self, db_path: str):
         self.db_path = db_path
+        self.conn = _connect(db_path)
+        self._write_lock = threading.Lock()
         self.init_db()
     
     def init_db(self):
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        cursor = self.conn.cursor()
         
         cursor.execute('''
             CREATE TABLE IF NOT EXISTS sips (
@@ -231,26 +476,19 @@ class SIPManager:
             )
         ''')
         
-        conn.commit()
-        conn.close()
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_sip_status ON sips(status)')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_sipt_sipid ON sip_transactions(sip_id)')
     
     def add_sip(self, fund_name: str, amount: float, frequency: str, 
                 start_date: str, end_date: str = None):
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        cursor.execute('''
-            INSERT INTO sips (fund_name, amount, frequency, start_date, end_date)
-            VALUES (?, ?, ?, ?, ?)
-        ''', (fund_name, amount, frequency, start_date, end_date))
-        conn.commit()
-        conn.close()
+        with self._write_lock:
+            self.conn.execute('''
+                INSERT INTO sips (fund_name, amount, frequency, start_date, end_date)
+                VALUES (?, ?, ?, ?, ?)
+            ''', (fund_name, amount, frequency, start_date, end_date))
     
     def get_active_sips(self) -> List[Dict]:
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        cursor.execute('SELECT * FROM sips WHERE status = "active"')
-        rows = cursor.fetchall()
-        conn.close()
+        rows = self.conn.execute('SELECT * FROM sips WHERE status = "active"').fetchall()
         
         sips = []
         for row in rows:
@@ -264,23 +502,41 @@ class SIPManager:
         return sips
     
     def calculate_sip_returns(self, sip_id: int) -> Dict:
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        cursor = self.conn.cursor()
         
-        cursor.execute('SELECT * FROM sip_transactions WHERE sip_id = ?', (sip_id,))
-        transactions = cursor.fetchall()
+        cursor.execute('''
+            SELECT COUNT(*), SUM(amount), SUM(units)
+            FROM sip_transactions WHERE sip_id = ?
+        ''', (sip_id,))
+        transaction_count, total_invested, total_units = cursor.fetchone()
         
         cursor.execute('SELECT * FROM sips WHERE id = ?', (sip_id,))
         sip_info = cursor.fetchone()
         
-        conn.close()
-        
-        if not transactions or not sip_info:
+        if not transaction_count or not sip_info:
             return {}
         
-        total_invested = sum(t[2] for t in transactions)  # amount
-        total_units = sum(t[4] for t in transactions)     # units
+        return self._sip_returns(sip_id, sip_info[1], total_invested, total_units)
+    
+    def calculate_all_sip_returns(self) -> Dict[int, Dict]:
+        """calculate_sip_returns for every active SIP with transactions, keyed by SIP id, in one query"""
+        cursor = self.conn.cursor()
+        cursor.row_factory = sqlite3.Row
+        cursor.execute('''
+            SELECT s.id, s.fund_name, SUM(t.amount) AS total_invested, SUM(t.units) AS total_units
+            FROM sips s
+            JOIN sip_transactions t ON t.sip_id = s.id
+            WHERE s.status = 'active'
+            GROUP BY s.id
+        ''')
         
+        return {
+            row['id']: self._sip_returns(row['id'], row['fund_name'], row['total_invested'], row['total_units'])
+            for row in cursor.fetchall()
+        }
+    
+    @staticmethod
+    def _sip_returns(sip_id: int, fund_name: str, total_invested: float, total_units: float) -> Dict:
         # Get current NAV (simplified - would need real API)
         current_nav = 50.0  # Placeholder
         current_value = total_units * current_nav
@@ -290,7 +546,7 @@ class SIPManager:
         
         return {
             'sip_id': sip_id,
-            'fund_name': sip_info[1],
+            'fund_name': fund_name,
             'total_invested': total_invested,
             'current_value': current_value,
             'returns': returns,
@@ -316,55 +572,88 @@ class SIPManager:
             'projected_corpus': current_amount * fv_factor,
             'shortfall': max(0, target_corpus - (current_amount * fv_factor))
         }
+    
+    def optimize_sip_amounts(self, current_amounts, target_corpuses, years,
+                             expected_returns=12.0) -> Dict[str, np.ndarray]:
+        """optimize_sip_amount for many goals at once; array arguments broadcast together"""
+        current_amounts = np.asarray(current_amounts, dtype=np.float64)
+        target_corpuses = np.asarray(target_corpuses, dtype=np.float64)
+        monthly_rate = np.asarray(expected_returns, dtype=np.float64) / (12 * 100)
+        months = np.asarray(years, dtype=np.float64) * 12
+        
+        # Future Value of Annuity factor; a zero rate reduces to the number of months
+        growth = np.expm1(months * np.log1p(monthly_rate))
+        with np.errstate(divide='ignore', invalid='ignore'):
+            fv_factor = np.where(monthly_rate == 0, months, growth / monthly_rate)
+        
+        required_sip = target_corpuses / fv_factor
+        projected_corpus = current_amounts * fv_factor
+        
+        return {
+            'current_sip': np.broadcast_to(current_amounts, required_sip.shape),
+            'required_sip': required_sip,
+            'difference': required_sip - current_amounts,
+            'target_corpus': np.broadcast_to(target_corpuses, required_sip.shape),
+            'projected_corpus': projected_corpus,
+            'shortfall': np.maximum(0, target_corpuses - projected_corpus)
+        }
 
 class TaxLossHarvester:
     def __init__(self, portfolio_tracker: PortfolioTracker):
         self.portfolio_tracker = portfolio_tracker
     
-    def identify_loss_opportunities(self, min_loss_percentage: float = 10.0) -> List[Dict]:
-        portfolio = self.portfolio_tracker.get_portfolio()
-        
-        opportunities = []
-        for inv in portfolio:
-            if inv.pnl_percentage < -min_loss_percentage:
-                # Calculate holding period
-                purchase_date = datetime.fromisoformat(inv.purchase_date)
-                holding_days = (datetime.now() - purchase_date).days
-                
-                tax_category = 'LTCG' if holding_days > 365 else 'STCG'
-                
-                opportunities.append({
-                    'symbol': inv.symbol,
-                    'name': inv.name,
-                    'quantity': inv.quantity,
-                    'current_loss': inv.pnl,
-                    'loss_percentage': inv.pnl_percentage,
-                    'holding_days': holding_days,
-                    'tax_category': tax_category,
-                    'potential_tax_benefit': abs(inv.pnl) * (0.15 if tax_category == 'STCG' else 0.10)
-                })
-        
-        return sorted(opportunities, key=lambda x: x['potential_tax_benefit'], reverse=True)
+    def identify_loss_opportunities(self, min_loss_percentage: float = 10.0,
+                                    portfolio: pd.DataFrame = None) -> List[Dict]:
+        df = portfolio if portfolio is not None else self.portfolio_tracker.get_portfolio_frame()
+        losses = df[df['pnl_percentage'] < -min_loss_percentage]
+        
+        is_long_term = losses['holding_days'].to_numpy() > 365
+        opportunities = pd.DataFrame({
+            'symbol': losses['symbol'],
+            'name': losses['name'],
+            'quantity': losses['quantity'],
+            'current_loss': losses['pnl'],
+            'loss_percentage': losses['pnl_percentage'],
+            'holding_days': losses['holding_days'],
+            'tax_category': np.where(is_long_term, 'LTCG', 'STCG'),
+            'potential_tax_benefit': losses['pnl'].abs() * np.where(is_long_term, 0.10, 0.15)
+        })
+        
+        opportunities = opportunities.sort_values('potential_tax_benefit', ascending=False, kind='stable')
+        return opportunities.to_dict('records')
     
-    def calculate_capital_gains(self, year: int = None) -> Dict:
+    def calculate_capital_gains(self, year: int = None, portfolio: pd.DataFrame = None) -> Dict:
         if year is None:
             year = datetime.now().year
         
-        portfolio = self.portfolio_tracker.get_portfolio()
-        
-        stcg = 0  # Short-term capital gains
-        ltcg = 0  # Long-term capital gains
+        if portfolio is not None:
+            # Only holdings bought in the given year
+            bought = portfolio[portfolio['purchase_date'].dt.year == year]
+            pnl = bought['pnl'].to_numpy()
+            long_term = bought['holding_days'].to_numpy() > 365
+        else:
+            # Filter by year and split short/long term in SQL, then price only those holdings
+            tracker = self.portfolio_tracker
+            rows = tracker.conn.execute('''
+                SELECT symbol, quantity, avg_price,
+                       CAST(julianday('now', 'localtime') - julianday(purchase_date) AS INTEGER) > 365
+                FROM investments
+                WHERE CAST(strftime('%Y', purchase_date) AS INTEGER) = ?
+            ''', (year,)).fetchall()
+            
+            prices = tracker.get_real_time_prices([row[0] for row in rows])
+            tracker.flush_price_history()
+            
+            quantities = np.array([row[1] for row in rows], dtype=np.float64)
+            avg_prices = np.array([row[2] for row in rows], dtype=np.float64)
+            current_prices = np.array([prices[row[0]] for row in rows], dtype=np.float64)
+            pnl = quantities * current_prices - quantities * avg_prices
+            long_term = np.array([bool(row[3]) for row in rows], dtype=bool)
         
-        for inv in portfolio:
-            if inv.pnl > 0:  # Only gains
-                purchase_date = datetime.fromisoformat(inv.purchase_date)
-                if purchase_date.year == year:
-                    holding_days = (datetime.now() - purchase_date).days
-                    
-                    if holding_days <= 365:
-                        stcg += inv.pnl
-                    else:
-                        ltcg += inv.pnl
+        # Only gains count
+        gains = pnl > 0
+        stcg = float(pnl[gains & ~long_term].sum())  # Short-term capital gains
+        ltcg = float(pnl[gains & long_term].sum())  # Long-term capital gains
         
         # Tax calculations (Indian rates)
         stcg_tax = stcg * 0.15  # 15% for equity STCG
@@ -388,12 +677,17 @@ class InvestmentManager:
         self.tax_harvester = TaxLossHarvester(self.portfolio_tracker)
     
     def get_investment_dashboard(self, age: int, risk_tolerance: str) -> Dict:
-        portfolio_summary = self.portfolio_tracker.get_portfolio_summary()
-        current_allocation = self.asset_allocator.get_current_allocation()
-        rebalancing_suggestions = self.asset_allocator.get_rebalancing_suggestions(age, risk_tolerance)
+        # Price the holdings once and share the snapshot between every section
+        portfolio = self.portfolio_tracker.get_portfolio_frame()
+        
+        portfolio_summary = self.portfolio_tracker.get_portfolio_summary(portfolio)
+        current_allocation = self.asset_allocator.get_current_allocation(portfolio)
+        rebalancing_suggestions = self.asset_allocator.get_rebalancing_suggestions(
+            age, risk_tolerance, current_allocation
+        )
         active_sips = self.sip_manager.get_active_sips()
-        tax_opportunities = self.tax_harvester.identify_loss_opportunities()
-        capital_gains = self.tax_harvester.calculate_capital_gains()
+        tax_opportunities = self.tax_harvester.identify_loss_opportunities(portfolio=portfolio)
+        capital_gains = self.tax_harvester.calculate_capital_gains(portfolio=portfolio)
         
         return {
             'portfolio_summary': portfolio_summary,
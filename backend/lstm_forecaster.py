@@ -2,6 +2,10 @@ import numpy as np
 import pandas as pd
 from typing import List, Dict, Optional, Tuple
 import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+import tensorflow as tf
 from tensorflow import keras
 from tensorflow.keras.models import Sequential
 from tensorflow.keras.layers import LSTM, Dense, Dropout
@@ -13,6 +17,12 @@ import os
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Forecasters training on different threads share the model files on disk
+_save_lock = threading.Lock()
+
+# Threads used by forecast_by_category, one per lookback group
+FORECAST_WORKERS = 4
+
 class LSTMExpenseForecaster:
     """LSTM-based expense forecasting optimized for low-memory systems"""
     
@@ -26,6 +36,9 @@ class LSTMExpenseForecaster:
         self.lookback = lookback
         self.model_path = model_path
         self.model = None
+        self._predict_one = None
+        self._interpreter = None
+        self.tflite_path = model_path.replace('.h5', '.tflite')
         self.scaler = MinMaxScaler(feature_range=(0, 1))
         self.is_trained = False
         
@@ -64,6 +77,26 @@ class LSTMExpenseForecaster:
         
         return model
     
+    def _build_predictor(self):
+        """Trace the model call once for a (1, lookback, 1) input so forecast steps skip predict()'s setup"""
+        model = self.model
+        # A fixed input signature gives one concrete function, so no call can trigger a retrace
+        self._predict_one = tf.function(
+            lambda x: model(x, training=False),
+            input_signature=[tf.TensorSpec((1, self.lookback, 1), tf.float32)]
+        ).get_concrete_function()
+        # Any TFLite copy belongs to the previous model
+        self._interpreter = None
+    
+    def _predict_scaled(self, X: np.ndarray) -> np.ndarray:
+        """Predict the next scaled value, using the TFLite model when one is loaded"""
+        X = np.asarray(X, dtype=np.float32)
+        if self._interpreter is not None:
+            self._interpreter.set_tensor(self._input_index, X)
+            self._interpreter.invoke()
+            return self._interpreter.get_tensor(self._output_index)
+        return self._predict_one(tf.constant(X, dtype=tf.float32)).numpy()
+    
     def prepare_data(self, data: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
         """Prepare time series data for LSTM training"""
         if len(data) < self.lookback + 1:
@@ -75,17 +108,12 @@ class LSTMExpenseForecaster:
         # Scale data
         scaled_data = self.scaler.fit_transform(data)
         
-        # Create sequences
-        X, y = [], []
-        for i in range(len(scaled_data) - self.lookback):
-            X.append(scaled_data[i:i + self.lookback, 0])
-            y.append(scaled_data[i + self.lookback, 0])
+        # Create sequences: each window of lookback + 1 values is one (X, y) pair
+        windows = np.lib.stride_tricks.sliding_window_view(scaled_data[:, 0], self.lookback + 1)
         
-        X = np.array(X)
-        y = np.array(y)
-        
-        # Reshape X for LSTM [samples, time steps, features]
-        X = X.reshape(X.shape[0], X.shape[1], 1)
+        # X shaped for LSTM [samples, time steps, features]
+        X = windows[:, :-1, np.newaxis].astype(np.float32)
+        y = windows[:, -1].astype(np.float32)
         
         return X, y
     
@@ -108,6 +136,7 @@ class LSTMExpenseForecaster:
             
             # Build model
             self.model = self.build_model(input_shape=(X.shape[1], 1))
+            self._build_predictor()
             
             # Early stopping to prevent overfitting
             early_stop = EarlyStopping(
@@ -163,39 +192,30 @@ class LSTMExpenseForecaster:
             data = data.reshape(-1, 1)
             scaled_data = self.scaler.transform(data)
             
-            # Forecast iteratively
-            forecasts = []
-            current_sequence = scaled_data.copy()
+            # Forecast iteratively; X is a view of the window, which slides in place
+            window = scaled_data.reshape(-1).astype(np.float32)
+            X = window.reshape(1, self.lookback, 1)
+            preds_scaled = np.empty((periods, 1))
             
-            for _ in range(periods):
-                # Reshape for prediction
-                X = current_sequence.reshape(1, self.lookback, 1)
-                
+            for step in range(periods):
                 # Predict next value
-                pred_scaled = self.model.predict(X, verbose=0)
-                pred = self.scaler.inverse_transform(pred_scaled)[0, 0]
-                
-                forecasts.append(float(pred))
+                pred_scaled = self._predict_scaled(X)[0, 0]
+                preds_scaled[step, 0] = pred_scaled
                 
                 # Update sequence for next prediction
-                current_sequence = np.append(current_sequence[1:], pred_scaled)
-                current_sequence = current_sequence.reshape(-1, 1)
+                window[:-1] = window[1:]
+                window[-1] = pred_scaled
+            
+            forecasts = self.scaler.inverse_transform(preds_scaled)[:, 0]
             
             # Calculate confidence intervals (simple approach)
             std = np.std(monthly_expenses[-12:]) if len(monthly_expenses) >= 12 else np.std(monthly_expenses)
             
-            forecast_data = []
-            for i, pred in enumerate(forecasts):
-                forecast_data.append({
-                    'month': i + 1,
-                    'forecast': max(0, pred),  # Ensure non-negative
-                    'lower_bound': max(0, pred - 1.96 * std),
-                    'upper_bound': pred + 1.96 * std
-                })
+            forecast_data = self._forecast_rows(forecasts, std)
             
             return {
                 'forecast': forecast_data,
-                'total_projected': sum(forecasts),
+                'total_projected': float(forecasts.sum()),
                 'average_monthly': np.mean(forecasts),
                 'model_type': 'LSTM',
                 'confidence': 0.95
@@ -227,15 +247,8 @@ class LSTMExpenseForecaster:
         else:
             trend = 0
         
-        forecast_data = []
-        for i in range(periods):
-            pred = avg + trend * (i + 1)
-            forecast_data.append({
-                'month': i + 1,
-                'forecast': max(0, pred),
-                'lower_bound': max(0, pred - 1.96 * std),
-                'upper_bound': pred + 1.96 * std
-            })
+        preds = avg + trend * np.arange(1, periods + 1)
+        forecast_data = self._forecast_rows(preds, std)
         
         return {
             'forecast': forecast_data,
@@ -245,26 +258,78 @@ class LSTMExpenseForecaster:
             'confidence': 0.7
         }
     
+    @staticmethod
+    def _forecast_rows(preds: np.ndarray, std: float) -> List[Dict]:
+        """Forecast rows with 95% bounds, computed for all months at once"""
+        forecast = np.maximum(0, preds)  # Ensure non-negative
+        lower = np.maximum(0, preds - 1.96 * std)
+        upper = preds + 1.96 * std
+        
+        return [
+            {'month': month, 'forecast': f, 'lower_bound': lo, 'upper_bound': up}
+            for month, f, lo, up in zip(range(1, len(preds) + 1), forecast.tolist(), lower.tolist(), upper.tolist())
+        ]
+    
     def save_model(self):
         """Save model and scaler"""
+        with _save_lock:
+            try:
+                if self.model:
+                    self.model.save(self.model_path)
+                    joblib.dump(self.scaler, self.model_path.replace('.h5', '_scaler.pkl'))
+                    logger.info(f"Model saved to {self.model_path}")
+            except Exception as e:
+                logger.error(f"Error saving model: {e}")
+                return
+            
+            self.save_tflite()
+    
+    def save_tflite(self):
+        """Export a quantized TFLite copy of the model for inference"""
         try:
-            if self.model:
-                self.model.save(self.model_path)
-                joblib.dump(self.scaler, self.model_path.replace('.h5', '_scaler.pkl'))
-                logger.info(f"Model saved to {self.model_path}")
+            converter = tf.lite.TFLiteConverter.from_keras_model(self.model)
+            # Dynamic-range quantization: int8 weights, no representative dataset needed
+            converter.optimizations = [tf.lite.Optimize.DEFAULT]
+            with open(self.tflite_path, 'wb') as f:
+                f.write(converter.convert())
+            self.load_tflite()
         except Exception as e:
-            logger.error(f"Error saving model: {e}")
+            logger.warning(f"Could not export TFLite model, using Keras for inference: {e}")
+    
+    def load_tflite(self):
+        """Load the TFLite model and allocate its tensors once"""
+        interpreter = tf.lite.Interpreter(model_path=self.tflite_path)
+        interpreter.resize_tensor_input(interpreter.get_input_details()[0]['index'], [1, self.lookback, 1])
+        interpreter.allocate_tensors()
+        
+        self._input_index = interpreter.get_input_details()[0]['index']
+        self._output_index = interpreter.get_output_details()[0]['index']
+        self._interpreter = interpreter
+        logger.info(f"TFLite model loaded from {self.tflite_path}")
     
     def load_model(self):
         """Load model and scaler"""
         try:
             self.model = keras.models.load_model(self.model_path)
+            self._build_predictor()
             self.scaler = joblib.load(self.model_path.replace('.h5', '_scaler.pkl'))
             self.is_trained = True
             logger.info(f"Model loaded from {self.model_path}")
         except Exception as e:
             logger.error(f"Error loading model: {e}")
             raise
+        
+        if os.path.exists(self.tflite_path):
+            try:
+                self.load_tflite()
+            except Exception as e:
+                logger.warning(f"Could not load TFLite model, using Keras for inference: {e}")
+
+
+@lru_cache(maxsize=8)
+def _get_shared_forecaster(lookback: int) -> LSTMExpenseForecaster:
+    """One forecaster per lookback, reused across categories instead of reloading the model each time"""
+    return LSTMExpenseForecaster(lookback=lookback)
 
 
 def forecast_by_category(transactions: pd.DataFrame, periods: int = 3) -> Dict[str, Dict]:
@@ -276,20 +341,35 @@ def forecast_by_category(transactions: pd.DataFrame, periods: int = 3) -> Dict[s
     Returns:
         Dictionary mapping category to forecast data
     """
-    forecasts = {}
+    # Monthly totals for every category in one groupby
+    months = pd.to_datetime(transactions['date'], errors='coerce').dt.to_period('M')
+    monthly_by_category = transactions.groupby([transactions['category'], months])['amount'].sum()
+    categories_with_data = set(monthly_by_category.index.get_level_values(0))
     
-    # Group by category
+    # Group the series by lookback: a forecaster is not thread-safe, so each group runs in order on one thread
+    categories = []
+    groups: Dict[int, List[Tuple[str, List[float]]]] = {}
     for category in transactions['category'].unique():
-        cat_txns = transactions[transactions['category'] == category]
-        
-        # Group by month
-        cat_txns['date'] = pd.to_datetime(cat_txns['date'], errors='coerce')
-        monthly = cat_txns.groupby(cat_txns['date'].dt.to_period('M'))['amount'].sum()
+        if category not in categories_with_data:
+            continue
+        monthly = monthly_by_category.xs(category, level=0)
         
         if len(monthly) >= 3:
-            # Forecast this category
-            forecaster = LSTMExpenseForecaster(lookback=min(6, len(monthly) - 1))
-            forecast = forecaster.forecast(monthly.values.tolist(), periods)
-            forecasts[category] = forecast
+            categories.append(category)
+            groups.setdefault(min(6, len(monthly) - 1), []).append((category, monthly.values.tolist()))
+    
+    # Create (or load) every forecaster before any of them trains, so no group depends on another's timing
+    forecasters = [_get_shared_forecaster(lookback) for lookback in groups]
+    
+    def forecast_group(forecaster: LSTMExpenseForecaster,
+                       series: List[Tuple[str, List[float]]]) -> List[Tuple[str, Dict]]:
+        return [(category, forecaster.forecast(values, periods)) for category, values in series]
+    
+    if len(groups) > 1:
+        with ThreadPoolExecutor(max_workers=min(FORECAST_WORKERS, len(groups))) as pool:
+            results = list(pool.map(forecast_group, forecasters, groups.values()))
+    else:
+        results = [forecast_group(forecaster, series) for forecaster, series in zip(forecasters, groups.values())]
     
-    return forecasts
+    forecasts = dict(pair for group in results for pair in group)
+    return {category: forecasts[category] for category in categories}
@@ -3,14 +3,62 @@ import pytesseract
 import numpy as np
 from PIL import Image
 import re
+import os
+import subprocess
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
 import logging
 import speech_recognition as sr
 import json
 
 logger = logging.getLogger(__name__)
 
+try:
+    import ahocorasick
+    AHOCORASICK_AVAILABLE = True
+except ImportError:
+    AHOCORASICK_AVAILABLE = False
+
+# Characters Tesseract may emit for receipts
+OCR_CHAR_WHITELIST = '0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz₹.,/:-\\s'
+
+# Several single-threaded Tesseract workers beat one OpenMP-threaded engine on
+# small receipt pages, so keep OpenMP off for every Tesseract child process
+os.environ.setdefault('OMP_THREAD_LIMIT', '1')
+OCR_WORKERS = min(os.cpu_count() or 1, 4)
+
+# Receipts shorter than this many pixels are upscaled before thresholding
+OCR_MIN_HEIGHT = 130.0
+
+
+def _keyword_automaton(keywords: List[Tuple[str, str]]):
+    """Aho-Corasick automaton over (keyword, label) pairs, or None without pyahocorasick"""
+    if not AHOCORASICK_AVAILABLE:
+        return None
+    
+    automaton = ahocorasick.Automaton()
+    for priority, (keyword, label) in enumerate(keywords):
+        # Earlier pairs win, so keep the first label seen for a repeated keyword
+        if keyword not in automaton:
+            automaton.add_word(keyword, (priority, label))
+    automaton.make_automaton()
+    return automaton
+
+
+def _match_keyword(automaton, keywords: List[Tuple[str, str]], text: str, default: str = 'other') -> str:
+    """Label of the earliest (keyword, label) pair whose keyword occurs in text"""
+    if automaton is not None:
+        # One pass over the text finds every keyword; the lowest priority wins
+        hits = [value for _, value in automaton.iter(text)]
+        return min(hits)[1] if hits else default
+    
+    for keyword, label in keywords:
+        if keyword in text:
+            return label
+    return default
+
 class ReceiptScanner:
     """OCR-based receipt scanning for bill processing"""
     
@@ -45,6 +93,30 @@ class ReceiptScanner:
             r'(\d{1,2}\s+\w{3}\s+\d{2,4})',
             r'(\d{2,4}[/-]\d{1,2}[/-]\d{1,2})'
         ]
+        
+        # Compiled once so extraction never goes through the re module cache
+        self._merchant_res: List[Tuple[str, re.Pattern]] = [
+            (merchant, re.compile(pattern, re.IGNORECASE))
+            for merchant, pattern in self.merchant_patterns.items()
+        ]
+        self._amount_res = [re.compile(pattern, re.IGNORECASE) for pattern in self.amount_patterns]
+        self._date_res = [re.compile(pattern, re.IGNORECASE) for pattern in self.date_patterns]
+        self._ws_table = str.maketrans('\n\t', '  ')
+        
+        # Merchant keywords per spending category
+        self.category_mapping = {
+            'groceries': ['dmart', 'bigbasket', 'reliance', 'more', 'supermarket', 'grocery'],
+            'food_dining': ['swiggy', 'zomato', 'restaurant', 'cafe', 'hotel'],
+            'transportation': ['uber', 'ola', 'taxi', 'auto', 'petrol', 'fuel'],
+            'shopping': ['amazon', 'flipkart', 'myntra', 'ajio', 'mall'],
+            'utilities': ['paytm', 'phonepe', 'gpay', 'recharge', 'bill']
+        }
+        self._category_keywords = [
+            (keyword, category)
+            for category, keywords in self.category_mapping.items()
+            for keyword in keywords
+        ]
+        self._category_ac = _keyword_automaton(self._category_keywords)
     
     def preprocess_image(self, image_path: str) -> np.ndarray:
         """Preprocess image for better OCR accuracy"""
@@ -57,17 +129,17 @@ class ReceiptScanner:
             # Convert to grayscale
             gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
             
+            # Upscale small images; larger ones are left at their native size
+            scale = OCR_MIN_HEIGHT / gray.shape[0]
+            if scale > 1:
+                gray = cv2.resize(gray, None, fx=scale, fy=scale, interpolation=cv2.INTER_CUBIC)
+            
             # Apply Gaussian blur to reduce noise
             blurred = cv2.GaussianBlur(gray, (5, 5), 0)
             
-            # Apply threshold to get binary image
-            _, thresh = cv2.threshold(blurred, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
-            
-            # Morphological operations to clean up
-            kernel = np.ones((1, 1), np.uint8)
-            processed = cv2.morphologyEx(thresh, cv2.MORPH_CLOSE, kernel)
-            
-            return processed
+            # Local thresholding copes with the uneven lighting of photographed receipts
+            return cv2.adaptiveThreshold(blurred, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C,
+                                         cv2.THRESH_BINARY, 31, 10)
             
         except Exception as e:
             logger.error(f"Error preprocessing image: {e}")
@@ -82,7 +154,7 @@ class ReceiptScanner:
                 return ""
             
             # Configure Tesseract for better accuracy
-            custom_config = r'--oem 3 --psm 6 -c tessedit_char_whitelist=0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz₹.,/:-\s'
+            custom_config = f'--oem 3 --psm 6 -c tessedit_char_whitelist={OCR_CHAR_WHITELIST}'
             
             # Extract text
             text = pytesseract.image_to_string(processed_img, config=custom_config, lang='eng')
@@ -98,44 +170,111 @@ class ReceiptScanner:
         try:
             # Extract text from image
             text = self.extract_text_from_image(image_path)
-            if not text:
-                return {'error': 'Could not extract text from image'}
-            
-            # Clean text
-            text = text.upper().replace('\n', ' ').replace('\t', ' ')
-            
-            # Extract merchant
-            merchant = self._extract_merchant(text)
-            
-            # Extract amount
-            amount = self._extract_amount(text)
-            
-            # Extract date
-            date = self._extract_date(text)
-            
-            # Determine category based on merchant
-            category = self._categorize_merchant(merchant)
-            
-            # Extract additional details
-            details = {
-                'merchant': merchant,
-                'amount': amount,
-                'date': date,
-                'category': category,
-                'raw_text': text[:500],  # First 500 chars for debugging
-                'confidence': self._calculate_confidence(merchant, amount, date)
-            }
-            
-            return details
+            return self._parse_text(text)
             
         except Exception as e:
             logger.error(f"Error parsing receipt: {e}")
             return {'error': str(e)}
     
+    def parse_receipts(self, image_paths: List[str]) -> List[Dict]:
+        """Parse several receipts with a single Tesseract run, in the order given"""
+        results: List[Optional[Dict]] = [None] * len(image_paths)
+        
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            # Preprocess every image up front and hand Tesseract one list file,
+            # so the engine is initialised once instead of once per receipt
+            pages = []
+            for i, image_path in enumerate(image_paths):
+                processed_img = self.preprocess_image(image_path)
+                if processed_img is None:
+                    results[i] = {'error': 'Could not extract text from image'}
+                    continue
+                page_path = os.path.join(tmp_dir, f'{i}.png')
+                cv2.imwrite(page_path, processed_img)
+                pages.append((i, page_path))
+            
+            if not pages:
+                return results
+            
+            list_path = os.path.join(tmp_dir, 'list.txt')
+            with open(list_path, 'w') as f:
+                f.write('\n'.join(page_path for _, page_path in pages) + '\n')
+            
+            # OpenMP threading only adds overhead on small receipt pages
+            env = dict(os.environ, OMP_THREAD_LIMIT='1')
+            try:
+                completed = subprocess.run(
+                    [pytesseract.pytesseract.tesseract_cmd, list_path, 'stdout',
+                     '--oem', '3', '--psm', '6', '-l', 'eng',
+                     '-c', f'tessedit_char_whitelist={OCR_CHAR_WHITELIST}'],
+                    capture_output=True, env=env, check=True
+                )
+            except (OSError, subprocess.CalledProcessError) as e:
+                logger.error(f"Error extracting text: {e}")
+                for i, _ in pages:
+                    results[i] = {'error': 'Could not extract text from image'}
+                return results
+        
+        # Tesseract ends every page with a form feed
+        texts = completed.stdout.decode('utf-8', errors='replace').split('\x0c')
+        for (i, _), text in zip(pages, texts):
+            try:
+                results[i] = self._parse_text(text.strip())
+            except Exception as e:
+                logger.error(f"Error parsing receipt: {e}")
+                results[i] = {'error': str(e)}
+        
+        return results
+    
+    def parse_receipts_parallel(self, image_paths: List[str], max_workers: int = None) -> List[Dict]:
+        """Parse receipts across a pool of Tesseract workers, in the order given"""
+        workers = min(max_workers or OCR_WORKERS, len(image_paths))
+        if workers <= 1:
+            return self.parse_receipts(image_paths)
+        
+        # Preprocessing and OCR both run outside the GIL, so threads are enough;
+        # each worker batches its contiguous share of the receipts into one run
+        chunk_size = -(-len(image_paths) // workers)
+        chunks = [image_paths[i:i + chunk_size] for i in range(0, len(image_paths), chunk_size)]
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            return [result for chunk in executor.map(self.parse_receipts, chunks) for result in chunk]
+    
+    def _parse_text(self, text: str) -> Dict:
+        """Extract transaction details from OCR text"""
+        if not text:
+            return {'error': 'Could not extract text from image'}
+        
+        # Clean text; the patterns ignore case, so the text is not uppercased
+        text = text.translate(self._ws_table)
+        
+        # Extract merchant
+        merchant = self._extract_merchant(text)
+        
+        # Extract amount
+        amount = self._extract_amount(text)
+        
+        # Extract date
+        date = self._extract_date(text)
+        
+        # Determine category based on merchant
+        category = self._categorize_merchant(merchant)
+        
+        # Extract additional details
+        details = {
+            'merchant': merchant,
+            'amount': amount,
+            'date': date,
+            'category': category,
+            'raw_text': text[:500].upper(),  # First 500 chars for debugging
+            'confidence': self._calculate_confidence(merchant, amount, date)
+        }
+        
+        return details
+    
     def _extract_merchant(self, text: str) -> str:
         """Extract merchant name from text"""
-        for merchant, pattern in self.merchant_patterns.items():
-            if re.search(pattern, text):
+        for merchant, pattern in self._merchant_res:
+            if pattern.search(text):
                 return merchant.title()
         
         # Try to extract from common positions
@@ -151,8 +290,8 @@ class ReceiptScanner:
     
     def _extract_amount(self, text: str) -> float:
         """Extract amount from text"""
-        for pattern in self.amount_patterns:
-            matches = re.findall(pattern, text)
+        for pattern in self._amount_res:
+            matches = pattern.findall(text)
             if matches:
                 # Get the largest amount (likely the total)
                 amounts = []
@@ -171,8 +310,8 @@ class ReceiptScanner:
     
     def _extract_date(self, text: str) -> str:
         """Extract date from text"""
-        for pattern in self.date_patterns:
-            matches = re.findall(pattern, text)
+        for pattern in self._date_res:
+            matches = pattern.findall(text)
             if matches:
                 date_str = matches[0]
                 # Try to parse and standardize date
@@ -203,21 +342,7 @@ class ReceiptScanner:
     
     def _categorize_merchant(self, merchant: str) -> str:
         """Categorize transaction based on merchant"""
-        merchant_lower = merchant.lower()
-        
-        category_mapping = {
-            'groceries': ['dmart', 'bigbasket', 'reliance', 'more', 'supermarket', 'grocery'],
-            'food_dining': ['swiggy', 'zomato', 'restaurant', 'cafe', 'hotel'],
-            'transportation': ['uber', 'ola', 'taxi', 'auto', 'petrol', 'fuel'],
-            'shopping': ['amazon', 'flipkart', 'myntra', 'ajio', 'mall'],
-            'utilities': ['paytm', 'phonepe', 'gpay', 'recharge', 'bill']
-        }
-        
-        for category, keywords in category_mapping.items():
-            if any(keyword in merchant_lower for keyword in keywords):
-                return category
-        
-        return 'other'
+        return _match_keyword(self._category_ac, self._category_keywords, merchant.lower())
     
     def _calculate_confidence(self, merchant: str, amount: float, date: str) -> float:
         """Calculate confidence score for extracted data"""
@@ -258,6 +383,9 @@ class VoiceCommandProcessor:
             r'income (?:rs|rupees|₹)?\s*(\d+(?:,\d{3})*(?:\.\d{2})?)\s*(?:rs|rupees|₹)?\s*(.+)'
         ]
         
+        self._expense_res = [re.compile(pattern, re.IGNORECASE) for pattern in self.expense_patterns]
+        self._income_res = [re.compile(pattern, re.IGNORECASE) for pattern in self.income_patterns]
+        
         # Category mapping for voice commands
         self.category_mapping = {
             'grocery': 'groceries', 'groceries': 'groceries', 'food': 'groceries',
@@ -270,6 +398,8 @@ class VoiceCommandProcessor:
             'shopping': 'shopping', 'clothes': 'shopping', 'amazon': 'shopping', 'flipkart': 'shopping',
             'medical': 'healthcare', 'doctor': 'healthcare', 'medicine': 'healthcare', 'hospital': 'healthcare'
         }
+        self._category_keywords = list(self.category_mapping.items())
+        self._category_ac = _keyword_automaton(self._category_keywords)
     
     def listen_for_command(self, timeout: int = 5) -> str:
         """Listen for voice command"""
@@ -302,8 +432,8 @@ class VoiceCommandProcessor:
             command = command.strip().lower()
             
             # Try expense patterns
-            for pattern in self.expense_patterns:
-                match = re.search(pattern, command, re.IGNORECASE)
+            for pattern in self._expense_res:
+                match = pattern.search(command)
                 if match:
                     amount_str = match.group(1).replace(',', '')
                     description = match.group(2).strip()
@@ -319,8 +449,8 @@ class VoiceCommandProcessor:
                     }
             
             # Try income patterns
-            for pattern in self.income_patterns:
-                match = re.search(pattern, command, re.IGNORECASE)
+            for pattern in self._income_res:
+                match = pattern.search(command)
                 if match:
                     amount_str = match.group(1).replace(',', '')
                     source = match.group(2).strip()
@@ -350,13 +480,7 @@ class VoiceCommandProcessor:
     
     def _categorize_description(self, description: str) -> str:
         """Categorize expense based on description"""
-        description_lower = description.lower()
-        
-        for keyword, category in self.category_mapping.items():
-            if keyword in description_lower:
-                return category
-        
-        return 'other'
+        return _match_keyword(self._category_ac, self._category_keywords, description.lower())
 
 class OfflineManager:
     """Offline mode functionality"""
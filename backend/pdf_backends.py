@@ -0,0 +1,24 @@
+"""
+Optional PDF text backends shared by the statement parsers
+PyMuPDF is preferred for its C text extractor; PyPDF2 is the pure Python fallback
+"""
+
+try:
+    import pymupdf  # PyMuPDF; releases before 1.24 only provide the `fitz` name
+    PYMUPDF_AVAILABLE = True
+except ImportError:
+    try:
+        import fitz as pymupdf
+        PYMUPDF_AVAILABLE = True
+    except ImportError:
+        pymupdf = None
+        PYMUPDF_AVAILABLE = False
+
+try:
+    import PyPDF2
+    PYPDF2_AVAILABLE = True
+except ImportError:
+    PyPDF2 = None
+    PYPDF2_AVAILABLE = False
+
+PDF_AVAILABLE = PYMUPDF_AVAILABLE or PYPDF2_AVAILABLE
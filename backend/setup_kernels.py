@@ -0,0 +1,14 @@
+"""
+Build the optional Cython finance kernels in place:
+
+    python setup_kernels.py build_ext --inplace
+"""
+
+from setuptools import setup
+from Cython.Build import cythonize
+
+setup(
+    name='indian_kernels',
+    ext_modules=cythonize('_indian_kernels.pyx', language_level=3),
+    zip_safe=False,
+)
@@ -0,0 +1,48 @@
+from dataclasses import dataclass
+from datetime import datetime
+from functools import lru_cache
+from typing import Dict, Any
+
+format_amount = '₹{:,.2f}'.format
+
+
+@lru_cache(maxsize=1024)
+def format_date(date: str) -> str:
+    """Render a YYYY-MM-DD date as e.g. '05 Mar 2024'; statements repeat dates"""
+    try:
+        return datetime.strptime(date, '%Y-%m-%d').strftime('%d %b %Y')
+    except ValueError:
+        return date
+
+
+@dataclass(slots=True)
+class Transaction:
+    """A single transaction extracted from a bank statement"""
+    date: str  # YYYY-MM-DD
+    description: str
+    amount: float
+    type: str  # 'credit' or 'debit'
+    category: str
+    bank: str
+
+    # Display strings are only built when serialized
+    @property
+    def formatted_date(self) -> str:
+        return format_date(self.date)
+
+    @property
+    def formatted_amount(self) -> str:
+        return format_amount(self.amount)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Dictionary form for JSON responses"""
+        return {
+            'date': self.date,
+            'formatted_date': self.formatted_date,
+            'description': self.description,
+            'amount': self.amount,
+            'formatted_amount': self.formatted_amount,
+            'type': self.type,
+            'category': self.category,
+            'bank': self.bank
+        }